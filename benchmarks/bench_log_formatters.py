@@ -0,0 +1,92 @@
+"""
+Micro-benchmark of the log formatters in `settingsgen.logger_configs`.
+
+Compares records per second of the previous `CustomLogFormatter` (which rewrote the shared
+format string for every record), the precompiled per-level `CustomLogFormatter` and the
+`JsonLogFormatter` while several threads format records concurrently.
+
+    python benchmarks/bench_log_formatters.py --threads 4 --records 50000
+"""
+import json
+import time
+import logging
+import argparse
+import threading
+
+from settingsgen.logger_configs import (CustomLogFormatter, JsonLogFormatter, RESET, DIM, BOLD, GREEN, RED,
+                                        BRIGHT_RED, YELLOW, BRIGHT_YELLOW, UNDERLINE)
+
+
+class LegacyCustomLogFormatter(logging.Formatter):
+    """The formatter as it was before the per-level formatters, kept as the baseline."""
+
+    def format(self, record):
+        if record.levelname == "DEBUG":
+            log_format = f'{DIM}%(asctime)-5s{RESET} {BOLD}{GREEN}[%(levelname)-4s]{RESET}' \
+                 f': {BOLD}"%(message)s"{RESET} {DIM}{UNDERLINE}%(name)-0s.%(filename)-5s {RESET}{BOLD}{GREEN}line %(lineno)d{RESET}'
+        elif record.levelname == "ERROR":
+            log_format = f'{DIM}{RED}%(asctime)-5s{RESET} {RED}[%(levelname)-4s]{RESET}' \
+                 f': {BOLD}{BRIGHT_RED}"%(message)s"{RESET} {DIM}{RED}{UNDERLINE}%(name)-0s.{BRIGHT_RED}%(filename)-5s  {RESET}{BOLD}{RED}line %(lineno)d{RESET}'
+        elif record.levelname == "WARNING":
+            log_format = f'{DIM}{YELLOW}%(asctime)-5s{RESET} {YELLOW}[%(levelname)-4s]{RESET}' \
+                 f': {BOLD}{BRIGHT_YELLOW}"%(message)s"{RESET} {DIM}{YELLOW}{UNDERLINE}%(name)-0s.{BRIGHT_YELLOW}%(filename)-5s {RESET}{BOLD}{YELLOW}line %(lineno)d{RESET}'
+        elif record.levelname == "INFO":
+            log_format = f'{DIM}%(asctime)-5s{RESET} [%(levelname)-4s]' \
+                 f': {BOLD}"%(message)s"{RESET} {DIM}{UNDERLINE}%(name)-0s.%(filename)-5s  {RESET}line %(lineno)d'
+        else:
+            log_format = '%(asctime)-5s : %(levelname)-8s | %(name)-5s.%(filename)-5s ___ %(message)s'
+
+        self._style._fmt = log_format
+        return super().format(record)
+
+
+def make_records(count: int):
+    levels = [logging.DEBUG, logging.INFO, logging.WARNING, logging.ERROR]
+    return [
+        logging.LogRecord('bench', levels[position % len(levels)], __file__, position, 'record %d of %s',
+                          (position, 'bench'), None)
+        for position in range(count)
+    ]
+
+
+def records_per_second(formatter: logging.Formatter, records, threads: int) -> float:
+    barrier = threading.Barrier(threads + 1)
+
+    def worker():
+        barrier.wait()
+        for record in records:
+            formatter.format(record)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    return len(records) * threads / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--records', type=int, default=50000, help='Records formatted per thread')
+    args = parser.parse_args()
+
+    date_format = "%Y-%m-%d %H:%M:%S"
+    formatters = {
+        'legacy_custom': LegacyCustomLogFormatter(datefmt=date_format),
+        'custom': CustomLogFormatter(datefmt=date_format),
+        'json': JsonLogFormatter(),
+        'json_uncached_asctime': JsonLogFormatter(cache_asctime=False),
+    }
+
+    records = make_records(args.records)
+    results = {name: round(records_per_second(formatter, records, args.threads))
+               for name, formatter in formatters.items()}
+    print(json.dumps({'threads': args.threads, 'records_per_thread': args.records,
+                      'records_per_second': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
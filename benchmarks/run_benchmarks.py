@@ -0,0 +1,209 @@
+"""
+Offline benchmark suite for the settings generation and access paths.
+
+Generates a synthetic `settings.yaml` of configurable depth, width and list length in a
+temporary project and measures:
+
+- `generate_dataclass_file` with a cold and a warm parse cache, and `generate_dataclasses_from_yaml`
+- `should_save_file` for an unchanged schema
+- the full `generate_app_settings`, both forced and as an up-to-date no-op
+- attribute, dotted-path and batch access latency of the generated `AppSettings`
+- cold import time of the generated `application_settings` module and of `settingsgen`
+
+Results are written as JSON. With `--baseline` every timing is compared to a previous
+result file and the run fails when one regressed by more than `--tolerance`.
+
+    python benchmarks/run_benchmarks.py --depth 4 --width 4 --list-length 200 --output results.json
+    python benchmarks/run_benchmarks.py --baseline benchmarks/baseline.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+import importlib
+
+from ruamel.yaml import YAML
+
+from settingsgen.generate_settings import generate_app_settings
+from settingsgen.type_generator import should_save_file
+from settingsgen.yaml_loader import cache_path_for, load_yaml
+from settingsgen.yaml_to_dataclass import generate_dataclass_file, generate_dataclasses_from_yaml
+
+# The generator logs every step at DEBUG level, which would dominate the timings
+logging.disable(logging.CRITICAL)
+
+
+def make_settings(depth: int, width: int, list_length: int, seed: int = 0) -> dict:
+    """Build a synthetic settings mapping.
+
+    Every level has `width` scalars, `width` nested sections (down to `depth`) and a list of
+    `list_length` dict items. Keys are prefixed with their level so the class names of the
+    generated dataclasses do not collide.
+    """
+    randomizer = random.Random(seed)
+
+    def section(level: int) -> dict:
+        data = {}
+        for position in range(width):
+            data[f'int_l{level}_{position}'] = randomizer.randint(0, 1000)
+            data[f'float_l{level}_{position}'] = randomizer.random() * 100
+            data[f'name_l{level}_{position}'] = f'value_{randomizer.randint(0, 1000)}'
+        data[f'items_l{level}'] = [
+            {'x': randomizer.random(), 'y': randomizer.random(), 'label': f'item_{item}'}
+            for item in range(list_length)
+        ]
+        if level < depth:
+            for position in range(width):
+                data[f'group_l{level}_{position}'] = section(level + 1)
+        return data
+
+    settings = {'mode': 'development'}
+    settings.update(section(1))
+    return settings
+
+
+def deepest_path(settings: dict) -> str:
+    """Dotted path to a scalar at the deepest level of the synthetic settings."""
+    parts = []
+    node = settings
+    while True:
+        groups = [key for key in node if key.startswith('group_')]
+        if not groups:
+            break
+        parts.append(groups[0])
+        node = node[groups[0]]
+    scalar = next(key for key in node if key.startswith('int_'))
+    return '.'.join(parts + [scalar])
+
+
+def measure(func, repeat: int = 5, number: int = 1) -> dict:
+    """Time `func` `number` times per round for `repeat` rounds, in microseconds per call."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number * 1e6)
+    return {'min_us': round(min(timings), 3), 'median_us': round(statistics.median(timings), 3)}
+
+
+def measure_import(code: str, cwd: str, repeat: int) -> dict:
+    """Cold import time in a fresh interpreter per round, in microseconds."""
+    script = f'import time; start = time.perf_counter(); {code}; print((time.perf_counter() - start) * 1e6)'
+    timings = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', script], cwd=cwd, check=True, capture_output=True, text=True)
+        timings.append(float(output.stdout.strip().splitlines()[-1]))
+    return {'min_us': round(min(timings), 3), 'median_us': round(statistics.median(timings), 3)}
+
+
+def run(depth: int, width: int, list_length: int, repeat: int) -> dict:
+    results = {}
+    settings = make_settings(depth, width, list_length)
+
+    with tempfile.TemporaryDirectory(prefix='settingsgen-bench-') as project:
+        yaml_path = os.path.join(project, 'settings.yaml')
+        with open(yaml_path, 'w') as settings_file:
+            YAML(typ='safe', pure=True).dump(settings, settings_file)
+        types_path = os.path.join(project, 'settings', 'settings_types.py')
+
+        parsed = load_yaml(yaml_path, use_cache=False)
+        code, _ = generate_dataclasses_from_yaml(parsed)
+
+        def generate_dataclass_file_cold():
+            # Without the parse cache every round parses the yaml like the first generation
+            if os.path.exists(cache_path):
+                os.remove(cache_path)
+            generate_dataclass_file(yaml_path, types_path)
+
+        cache_path = cache_path_for(yaml_path)
+        results['generate_dataclass_file_cold'] = measure(generate_dataclass_file_cold, repeat)
+        results['generate_dataclass_file'] = measure(lambda: generate_dataclass_file(yaml_path, types_path), repeat)
+        results['generate_dataclasses_from_yaml'] = measure(lambda: generate_dataclasses_from_yaml(parsed), repeat)
+        results['should_save_file'] = measure(lambda: should_save_file(code, code), repeat)
+        results['generate_app_settings_forced'] = measure(lambda: generate_app_settings(project, force=True), repeat)
+        results['generate_app_settings_noop'] = measure(lambda: generate_app_settings(project), repeat, number=10)
+
+        results['import_generated_module_cold'] = measure_import('import settings.application_settings', project,
+                                                                 repeat)
+        results['import_settingsgen_cold'] = measure_import('import settingsgen', project, repeat)
+
+        sys.path.insert(0, project)
+        try:
+            application_settings = importlib.import_module('settings.application_settings')
+        finally:
+            sys.path.remove(project)
+        app_settings = application_settings.__settings__
+        path = deepest_path(settings)
+        parts = path.split('.')
+        many = [path] * 32
+
+        def attribute_access():
+            node = app_settings.root_schema
+            for part in parts:
+                node = getattr(node, part)
+
+        results['access_first_load'] = measure(app_settings.reload, repeat)
+        results['access_attribute_chain'] = measure(attribute_access, repeat, number=1000)
+        results['access_dotted_path'] = measure(lambda: app_settings[path], repeat, number=1000)
+        results['access_get_many_32'] = measure(lambda: app_settings.get_many(many), repeat, number=1000)
+
+        app_settings.check_for_changes = False
+        results['access_dotted_path_unchecked'] = measure(lambda: app_settings[path], repeat, number=1000)
+
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Names of the benchmarks whose median is more than `tolerance` slower than the baseline."""
+    regressions = []
+    for name, timing in results.items():
+        reference = baseline.get('results', {}).get(name)
+        if reference and timing['median_us'] > reference['median_us'] * (1 + tolerance):
+            regressions.append(f"{name}: {timing['median_us']:.1f} us vs {reference['median_us']:.1f} us")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--depth', type=int, default=3, help='Nesting depth of the synthetic settings')
+    parser.add_argument('--width', type=int, default=3, help='Scalars and nested sections per level')
+    parser.add_argument('--list-length', type=int, default=50, help='Items in the list section of every level')
+    parser.add_argument('--repeat', type=int, default=5, help='Rounds per benchmark')
+    parser.add_argument('--output', help='Write the results as JSON to this file (default: stdout)')
+    parser.add_argument('--baseline', help='Compare against a previous JSON result file')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed slowdown against the baseline')
+    args = parser.parse_args()
+
+    report = {
+        'parameters': {'depth': args.depth, 'width': args.width, 'list_length': args.list_length,
+                       'repeat': args.repeat},
+        'environment': {'python': platform.python_version(), 'platform': platform.platform()},
+        'results': run(args.depth, args.width, args.list_length, args.repeat),
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            output_file.write(output + '\n')
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare(report['results'], json.load(baseline_file), args.tolerance)
+        for regression in regressions:
+            print(f'Regression: {regression}', file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
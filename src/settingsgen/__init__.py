@@ -1,17 +1,37 @@
-import os
+"""
+Importing `settingsgen` itself is kept free of side effects: `__settings__`, `loaded_settings`
+and `logger` are only imported on first use (which parses the settings, loads `.env` and
+configures logging). A bare `import settingsgen` should stay within a 2 ms cumulative budget
+in `python -X importtime -c "import settingsgen"` and must not import any third party package.
+"""
 import sys
 
-root = os.path.abspath(
-        os.path.join(os.path.dirname(__file__), "..")
-    )
+# Public attribute -> module it is lazily imported from
+_LAZY_ATTRIBUTES = {
+    '__settings__': 'settingsgen.application_settings',
+    'loaded_settings': 'settingsgen.application_settings',
+    'logger': 'settingsgen.logger_configs',
+}
 
-sys.path.append(root)
 
-try:
-    from settingsgen.application_settings import __settings__, loaded_settings
-    from settingsgen.logger_configs import logger
-except ImportError: 
-    pass
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    try:
+        __import__(module_name)
+    except ImportError as error:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r} ({error})") from error
+
+    value = getattr(sys.modules[module_name], name)
+    # Cache on the package so later lookups do not go through `__getattr__` again
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
 
 
 # from settingsgen.generate_settings import generate_app_settings
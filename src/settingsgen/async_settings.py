@@ -0,0 +1,129 @@
+"""
+Asyncio front end for the generated settings.
+
+    settings = AsyncSettings(application_settings.__settings__)
+    await settings.load()
+    settings.robot.arm.speed          # served from the cached snapshot, never blocks
+    async for change in settings.watch():
+        print(change.changed_paths)
+
+Reading and parsing `settings.yaml` and building the dataclasses run in an executor, the
+synchronous reads only ever serve the last loaded snapshot, so a slow parse never stalls
+the event loop. The executor has to run the work in this process (a thread pool), as the
+reload swaps the snapshot of the wrapped settings.
+"""
+import asyncio
+import logging
+
+from dataclasses import dataclass
+from concurrent.futures import Executor
+from typing import Any, AsyncIterator, List, Optional
+
+from settingsgen.path_index import changed_paths
+from settingsgen.settings_watcher import SettingsWatcher
+
+logger = logging.getLogger('rl_commons.settingsgen')
+
+_MISSING = object()
+
+
+@dataclass
+class SettingsChange:
+    old: Any
+    new: Any
+    # Dotted paths whose value changed, parents included
+    changed_paths: List[str]
+
+
+class AsyncSettings:
+    """Wraps a generated `AppSettings` or `Configurator` with awaitable loading."""
+
+    def __init__(self, settings, executor: Optional[Executor] = None):
+        self.settings = settings
+        self.executor = executor
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def load(self):
+        """The current snapshot, loaded in the executor if there is none yet."""
+        snapshot = self.settings.snapshot
+        if snapshot is None:
+            snapshot = await self.reload()
+        return snapshot
+
+    async def reload(self):
+        """Parse `settings.yaml` again in the executor and return the new snapshot."""
+        return await self._run(self.settings.reload)
+
+    def _reload_changes(self) -> Optional[SettingsChange]:
+        old = self.settings.snapshot
+        new = self.settings.reload()
+        paths = changed_paths(old, new)
+        return SettingsChange(old, new, paths) if paths else None
+
+    async def watch(self, debounce: float = 0.2, poll_interval: float = 1.0,
+                    use_inotify: bool = None) -> AsyncIterator[SettingsChange]:
+        """Yield a `SettingsChange` whenever `settings.yaml` or the `settings.<mode>.yaml`
+        changes on disk, until the loop over it is left.
+        """
+        loop = asyncio.get_running_loop()
+        changes = asyncio.Queue()
+
+        def on_file_changed():
+            # Called in the watcher thread
+            loop.call_soon_threadsafe(changes.put_nowait, None)
+
+        await self.load()
+        watcher = SettingsWatcher(self.settings.settings_file, on_file_changed, debounce=debounce,
+                                  poll_interval=poll_interval, use_inotify=use_inotify,
+                                  other_filepaths=self.settings.watched_files()[1:])
+        watcher.start()
+        try:
+            while True:
+                await changes.get()
+                try:
+                    change = await self._run(self._reload_changes)
+                except Exception:
+                    # A half-written or invalid file must not end the watch, the last good
+                    # snapshot stays in place and the next write retries
+                    logger.exception(f'Reloading `{self.settings.settings_file}` failed')
+                    continue
+                # A reload can switch to another mode file
+                watcher.other_filepaths = self.settings.watched_files()[1:]
+                if change is not None:
+                    yield change
+        finally:
+            # Joining the watcher thread can take up to `poll_interval`
+            await self._run(watcher.stop)
+
+    @property
+    def general_settings(self):
+        snapshot = self.settings.snapshot
+        if snapshot is None:
+            raise RuntimeError('The settings are not loaded yet, `await settings.load()` first')
+        return snapshot
+
+    root_schema = general_settings
+
+    def get(self, path: str, default=None):
+        return self.settings.path_index_of(self.general_settings).get(path, default)
+
+    def get_many(self, paths, default=None) -> dict:
+        return self.settings.path_index_of(self.general_settings).get_many(paths, default)
+
+    def __getitem__(self, path: str):
+        value = self.settings.path_index_of(self.general_settings).get(path, _MISSING)
+        if value is _MISSING:
+            raise KeyError(path)
+        return value
+
+    def __contains__(self, path: str) -> bool:
+        return path in self.settings.path_index_of(self.general_settings)
+
+    def __getattr__(self, name: str):
+        # Fields of the settings, e.g. `settings.robot`
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.general_settings, name)
+
@@ -0,0 +1,139 @@
+import os
+import glob
+import time
+import logging
+import traceback
+
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger('rl_commons.settingsgen')
+
+CHANGED = 'changed'
+UNCHANGED = 'unchanged'
+FAILED = 'failed'
+
+
+@dataclass
+class ProjectResult:
+    directory: str
+    status: str
+    duration: float
+    error: Optional[str] = None
+
+
+def is_glob_pattern(pattern: str) -> bool:
+    return any(character in pattern for character in '*?[')
+
+
+def find_projects(patterns: Iterable[str]) -> List[str]:
+    """Expand directories, `settings.yaml` paths and glob patterns (`**` is supported) into a
+    sorted list of unique project directories.
+
+    Directories matched by a glob pattern only count as a project when they contain a
+    `settings.yaml`, explicitly given paths are always included, also when they do not exist
+    (`generate_project` reports those as failed).
+    """
+    projects = set()
+    for pattern in patterns:
+        is_pattern = is_glob_pattern(pattern)
+        for match in glob.glob(pattern, recursive=True) if is_pattern else [pattern]:
+            if os.path.isfile(match) and os.path.basename(match) == 'settings.yaml':
+                match = os.path.dirname(match) or os.curdir
+            elif is_pattern and not os.path.isfile(os.path.join(match, 'settings.yaml')):
+                continue
+            if os.path.isdir(match) or not is_pattern:
+                projects.add(os.path.abspath(match))
+    return sorted(projects)
+
+
+def generate_project(directory: str, **options) -> ProjectResult:
+    """Run the settings generation for one project, turning any failure into a result.
+    The `options` are passed on to `generate_app_settings`.
+    """
+    # Imported here, `generate_settings` imports this module for its CLI
+    from settingsgen.generate_settings import generate_app_settings
+
+    start = time.perf_counter()
+    if not os.path.isdir(directory):
+        return ProjectResult(directory, FAILED, time.perf_counter() - start, f'No such project directory: {directory}')
+    try:
+        is_changed = generate_app_settings(directory, **options)
+    except Exception:
+        return ProjectResult(directory, FAILED, time.perf_counter() - start, traceback.format_exc())
+    return ProjectResult(directory, CHANGED if is_changed else UNCHANGED, time.perf_counter() - start)
+
+
+def generate_isolated(directory: str, **options) -> ProjectResult:
+    """Run `generate_project` in a worker process of its own, so a crash of the worker (e.g.
+    a segfault or an OOM kill) only fails this project.
+    """
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        try:
+            return executor.submit(generate_project, directory, **options).result()
+        except BrokenProcessPool:
+            return ProjectResult(directory, FAILED, time.perf_counter() - start,
+                                 'The worker process generating the project crashed')
+        except Exception as error:
+            return ProjectResult(directory, FAILED, time.perf_counter() - start, repr(error))
+
+
+def generate_many(directories: Iterable[str], max_workers: Optional[int] = None, **options) -> List[ProjectResult]:
+    """Generate the settings of many projects in a process pool, with the `options` of
+    `generate_app_settings`.
+
+    A failing project (or a crashing worker) is reported as `failed` and does not stop the
+    others. The results are returned in the order of `directories`.
+    """
+    directories = list(directories)
+    if not directories:
+        return []
+
+    results: Dict[int, ProjectResult] = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(generate_project, directory, **options) for directory in directories]
+        for position, (directory, future) in enumerate(zip(directories, futures)):
+            try:
+                results[position] = future.result()
+            except BrokenProcessPool:
+                # A crashing worker breaks the whole pool and fails every pending future
+                pass
+            except Exception as error:
+                results[position] = ProjectResult(directory, FAILED, 0.0, repr(error))
+
+    # The projects that were pending when the pool broke are generated again, each in its own
+    # process, so only the project that crashes its worker fails
+    unfinished = [position for position in range(len(directories)) if position not in results]
+    if unfinished:
+        logger.warning(f'A worker process crashed, generating the {len(unfinished)} unfinished projects '
+                       f'in separate processes')
+        with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            isolated = executor.map(lambda position: generate_isolated(directories[position], **options), unfinished)
+            results.update(zip(unfinished, isolated))
+    return [results[position] for position in range(len(directories))]
+
+
+def summarize(results: Iterable[ProjectResult]) -> Dict[str, int]:
+    summary = {CHANGED: 0, UNCHANGED: 0, FAILED: 0}
+    for result in results:
+        summary[result.status] += 1
+    return summary
+
+
+def log_result(result: ProjectResult):
+    if result.status == FAILED:
+        logger.error(f'{result.directory}: {FAILED} after {result.duration * 1000:.1f} ms\n{result.error}')
+    else:
+        logger.info(f'{result.directory}: {result.status} in {result.duration * 1000:.1f} ms')
+
+
+def log_results(results: List[ProjectResult], elapsed: float):
+    for result in results:
+        log_result(result)
+
+    summary = summarize(results)
+    logger.info(f'{len(results)} projects in {elapsed:.2f} s: {summary[CHANGED]} changed, '
+                f'{summary[UNCHANGED]} unchanged, {summary[FAILED]} failed')
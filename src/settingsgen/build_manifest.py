@@ -0,0 +1,76 @@
+import os
+import json
+import logging
+
+from typing import Any, Dict, Iterable, Optional
+
+logger = logging.getLogger('rl_commons.settingsgen')
+
+# Bump whenever the generated code changes, so existing manifests are invalidated
+GENERATOR_VERSION = '0.10.9'
+
+# Bump (with GENERATOR_VERSION) whenever the generated `settings_types.py` changes. Only this
+# version goes into the schema fingerprint, so changes of `application_settings.py` alone do
+# not rewrite the types, which projects usually keep in git
+TYPES_CODE_VERSION = '2'
+
+MANIFEST_FILENAME = '.settingsgen-manifest.json'
+
+
+def manifest_path_for(settings_dir: str) -> str:
+    return os.path.join(settings_dir, MANIFEST_FILENAME)
+
+
+def output_stat(filepath: str) -> Optional[list]:
+    """Cheap fingerprint of a generated file to notice when it was edited or deleted."""
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def read_manifest(settings_dir: str) -> Dict[str, Any]:
+    try:
+        with open(manifest_path_for(settings_dir), 'r') as manifest_file:
+            manifest = json.load(manifest_file)
+    except (OSError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def write_manifest(settings_dir: str, yaml_hash: str, options: Dict[str, Any], outputs: Iterable[str]):
+    manifest = {
+        'generator_version': GENERATOR_VERSION,
+        'yaml_hash': yaml_hash,
+        'options': options,
+        'outputs': {name: output_stat(os.path.join(settings_dir, name)) for name in outputs},
+    }
+    manifest_path = manifest_path_for(settings_dir)
+    temporary_path = f'{manifest_path}.tmp'
+    try:
+        with open(temporary_path, 'w') as manifest_file:
+            json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+        os.replace(temporary_path, manifest_path)
+    except OSError as error:
+        logger.warning(f'Could not write the build manifest `{manifest_path}`: {error}')
+
+
+def is_generator_current(manifest: Dict[str, Any], options: Dict[str, Any]) -> bool:
+    """Whether the outputs were produced by this generator version with the same options."""
+    return manifest.get('generator_version') == GENERATOR_VERSION and manifest.get('options') == options
+
+
+def is_output_intact(manifest: Dict[str, Any], settings_dir: str, name: str) -> bool:
+    """Whether the output file still is exactly the file that was written by the last build."""
+    recorded = manifest.get('outputs', {}).get(name)
+    return recorded is not None and recorded == output_stat(os.path.join(settings_dir, name))
+
+
+def is_up_to_date(manifest: Dict[str, Any], yaml_hash: str, options: Dict[str, Any],
+                  settings_dir: str, outputs: Iterable[str]) -> bool:
+    return (
+        manifest.get('yaml_hash') == yaml_hash
+        and is_generator_current(manifest, options)
+        and all(is_output_intact(manifest, settings_dir, name) for name in outputs)
+    )
@@ -0,0 +1,95 @@
+"""
+Frozen settings snapshots for a parse free startup.
+
+`generate-settings --freeze` parses `settings.yaml` once at build time and writes the data to
+a pickle next to the generated code, together with the content hash of the yaml it was built
+from. At startup the generated settings then only hash the yaml and unpickle the data,
+ruamel.yaml is not even imported. Pickle (like the parse cache) handles every type the safe
+loader returns, e.g. the `datetime.date` of `release: 2024-01-01`, which marshal does not.
+
+A snapshot that does not match the yaml anymore (or that is missing or corrupt) is stale and
+either rebuilt or rejected.
+"""
+import os
+import pickle
+import logging
+
+from typing import Any, Optional, Tuple
+
+from settingsgen.yaml_loader import content_hash, parse_yaml
+
+logger = logging.getLogger('rl_commons.settingsgen')
+
+SNAPSHOT_FILENAME = 'settings_snapshot.bin'
+
+# Bump when the layout of the snapshot blob changes, old snapshots are then stale
+SNAPSHOT_FORMAT_VERSION = 2
+
+ON_STALE_REBUILD = 'rebuild'
+ON_STALE_REJECT = 'reject'
+
+
+def write_snapshot(yaml_path: str, snapshot_path: str, content: bytes = None) -> Tuple[Any, bool]:
+    """Parse the yaml and write its data with the content hash to `snapshot_path`.
+    Returns the parsed data and whether the snapshot was written.
+    """
+    if content is None:
+        with open(yaml_path, 'rb') as yaml_file:
+            content = yaml_file.read()
+    data = parse_yaml(content)
+
+    temporary_path = f'{snapshot_path}.{os.getpid()}.tmp'
+    try:
+        blob = pickle.dumps((SNAPSHOT_FORMAT_VERSION, content_hash(content), data), protocol=pickle.HIGHEST_PROTOCOL)
+        with open(temporary_path, 'wb') as snapshot_file:
+            snapshot_file.write(blob)
+        os.replace(temporary_path, snapshot_path)
+    except (OSError, pickle.PicklingError) as error:
+        logger.warning(f'Could not write the settings snapshot `{snapshot_path}`: {error}')
+        try:
+            os.remove(temporary_path)
+        except OSError:
+            pass
+        return data, False
+    return data, True
+
+
+def read_snapshot(snapshot_path: str) -> Optional[Tuple[str, Any]]:
+    """The `(yaml_hash, data)` of a snapshot, None when it is missing, corrupt or outdated."""
+    try:
+        with open(snapshot_path, 'rb') as snapshot_file:
+            version, yaml_hash, data = pickle.loads(snapshot_file.read())
+    except Exception:
+        return None
+    if version != SNAPSHOT_FORMAT_VERSION:
+        return None
+    return yaml_hash, data
+
+
+def load_snapshot(yaml_path: str, snapshot_path: str, on_stale: str = ON_STALE_REBUILD) -> Any:
+    """Load the settings data from the snapshot after checking it against the yaml.
+
+    A stale snapshot is rebuilt from the yaml with `on_stale='rebuild'`, with `'reject'` a
+    ValueError is raised instead. Without a `settings.yaml` (e.g. a container that only ships
+    the snapshot) there is nothing to check against and the snapshot is used as it is.
+    """
+    if on_stale not in (ON_STALE_REBUILD, ON_STALE_REJECT):
+        raise ValueError(f'`on_stale` should be `{ON_STALE_REBUILD}` or `{ON_STALE_REJECT}`, got `{on_stale}`')
+
+    snapshot = read_snapshot(snapshot_path)
+    try:
+        with open(yaml_path, 'rb') as yaml_file:
+            content = yaml_file.read()
+    except FileNotFoundError:
+        if snapshot is None:
+            raise
+        return snapshot[1]
+
+    if snapshot is not None and snapshot[0] == content_hash(content):
+        return snapshot[1]
+
+    if on_stale == ON_STALE_REJECT:
+        raise ValueError(f'The settings snapshot `{snapshot_path}` is stale or corrupt, '
+                         f'regenerate it with `generate-settings --freeze`')
+    logger.warning(f'The settings snapshot `{snapshot_path}` is stale or corrupt, rebuilding it')
+    return write_snapshot(yaml_path, snapshot_path, content)[0]
@@ -1,48 +1,114 @@
 import os
+import sys
+import time
+import re
 import inspect
 import logging
+import argparse
+import importlib.util
 
-from typing import get_type_hints, get_origin, get_args, List, Optional
+from typing import get_type_hints, get_origin, get_args, Union
 
 # from settings_types import RootSchema
 from settingsgen.type_generator import smart_schema_update
+from settingsgen.yaml_loader import content_hash
+from settingsgen.frozen_snapshot import SNAPSHOT_FILENAME, write_snapshot
+from settingsgen.schema_constraints import load_constraints, schema_path_for
+from settingsgen.batch_generate import FAILED, find_projects, generate_many, is_glob_pattern, log_results, summarize
+from settingsgen.watch_generate import GeneratorDaemon
+from settingsgen.build_manifest import (read_manifest, write_manifest, is_up_to_date, is_generator_current,
+                                        is_output_intact)
 from settingsgen.logger_configs import logger
-from dataclasses import dataclass
-from typing import List, Optional, Any
 
 logger = logging.getLogger('rl_commons.settingsgen')
 
+GENERATED_FILES = ('settings_types.py', 'application_settings.py')
 
-@dataclass
-class RootSchema:
-    mode: str
+# Only generated with `instrument`, so uninstrumented settings carry no overhead
+INSTRUMENTED_CLASSES = '''
+from settingsgen.settings_stats import InstrumentedSettings
+
+
+class InstrumentedConfigurator(InstrumentedSettings, Configurator):
+    pass
+
+
+class InstrumentedAppSettings(InstrumentedSettings, AppSettings):'''
 
 
 def is_dataclass_type(type_hint):
     return inspect.isclass(type_hint) and hasattr(type_hint, "__dataclass_fields__")
 
 
-def generate_properties(cls, accessor="root_schema", level=1):
+def load_settings_types(settings_types_filepath: str):
+    """Import the generated `settings_types.py` on its own, to read the generated types."""
+    spec = importlib.util.spec_from_file_location('_generated_settings_types', settings_types_filepath)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def type_name(type_hint) -> str:
+    """The annotation of a type in the generated code, e.g. `List[Waypoints]`."""
+    origin = get_origin(type_hint)
+    if origin is list:
+        return f"List[{type_name(get_args(type_hint)[0])}]"
+    if origin is Union:
+        members = [member for member in get_args(type_hint) if member is not type(None)]
+        names = ", ".join(type_name(member) for member in members)
+        annotation = names if len(members) == 1 else f"Union[{names}]"
+        return f"Optional[{annotation}]" if len(members) < len(get_args(type_hint)) else annotation
+    return getattr(type_hint, "__name__", "Any")
+
+
+def generate_properties(cls, accessor="root_schema", level=1, property_names=None, instrument=False):
+    """Properties on `AppSettings` for the fields of `cls` that hold dataclasses, skipping the
+    names in `property_names` (which the generated names are added to). With `instrument` the
+    properties record their dotted settings path, for `InstrumentedAppSettings`.
+    """
     indent = "    " * level
     type_hints = get_type_hints(cls)
+    if property_names is None:
+        property_names = set()
 
     props_code = ""
     for field_name, field_type in type_hints.items():
         real_type = field_type
 
-        if get_origin(field_type) in {list, List, Optional}:
+        if get_origin(field_type) in {list, Union}:
             real_type = get_args(field_type)[0]
 
-        if is_dataclass_type(real_type):
+        if is_dataclass_type(real_type) and field_name not in property_names:
+            property_names.add(field_name)
             props_code += f"\n{indent}@property\n"
-            props_code += f"{indent}def {field_name}(self) -> {real_type.__name__}:\n"
-            # props_code += f"{indent}    return {real_type.__name__}(**self.{accessor}.{field_name})\n"
+            props_code += f"{indent}def {field_name}(self) -> {type_name(field_type)}:\n"
+            if instrument:
+                path = f"{accessor}.{field_name}".split(".", 1)[1]
+                props_code += f"{indent}    self._stats.record_path({path!r})\n"
             props_code += f"{indent}    return self.{accessor}.{field_name}\n"
 
     return props_code
 
 
-def generate_app_settings(directory_path):
+def generate_app_settings(directory_path, frozen_slots: bool = False, sample_size: int = None,
+                          force: bool = False, freeze: bool = False, instrument: bool = False,
+                          lazy: bool = False) -> bool:
+    """Generate `settings/settings_types.py` and `settings/application_settings.py` from the
+    `settings.yaml` in `directory_path`. Returns whether any of the files was written.
+
+    With `frozen_slots` the settings types are generated as frozen dataclasses with `__slots__`.
+    With `sample_size` the yaml is streamed and the schema is inferred from the first
+    `sample_size` items of every list, so large tables are never loaded completely.
+    With `freeze` the parsed settings are also written to a snapshot, which the generated
+    settings load at startup instead of parsing `settings.yaml`.
+    With `instrument` the settings record access, reload and parse stats, see `stats()`.
+    With `lazy` the nested settings types are only built when they are first accessed.
+    The constraints of a `settings.schema.yaml` next to `settings.yaml` are compiled into the
+    loader of the settings types, see `schema_constraints`.
+    A build manifest in the `settings` directory makes the call a no-op when nothing changed
+    since the last run, unless `force` is set.
+    Raises a FileNotFoundError when `directory_path` does not exist.
+    """
     
     code = '''
 """
@@ -52,29 +118,279 @@ def generate_app_settings(directory_path):
 """
 
 import os
+import logging
+import threading
 
-from ruamel.yaml import YAML
 from .settings_types import *
-from dacite import from_dict
+from .settings_types import _load_RootSchema
+from settingsgen.yaml_loader import load_yaml
+from settingsgen.frozen_snapshot import load_snapshot
+from settingsgen.shared_snapshot import SharedSnapshotPublisher, SharedSnapshotReader
+from settingsgen.overrides import ENV_PREFIX, apply_layers, mode_file_for
+from settingsgen.settings_watcher import SettingsWatcher, file_stat_key
+from settingsgen.path_index import PathIndex
+
+logger = logging.getLogger('rl_commons.settingsgen')
+
+_MISSING = object()
 
 
 class Configurator:
-    def __init__(self, path: str):
-        self.yaml = YAML()
+    def __init__(self, path: str, check_for_changes: bool = None, snapshot_file: str = None, on_stale: str = None,
+                 shared_file: str = None, layered: bool = None, env_prefix: str = None):
         self.path = os.path.abspath(path)
-
-    @property
-    def general_settings(self):
+        self.settings_file = os.path.join(self.path, "settings.yaml")
+
+        # `settings.yaml` is overridden by `settings.<mode>.yaml` and by environment variables
+        # such as `APP__ROBOT__ARM__SPEED`, merged once per snapshot
+        if layered is None:
+            layered = os.getenv("SETTINGS_LAYERED", "1") != "0"
+        self.layered = layered
+        self.env_prefix = env_prefix or os.getenv("SETTINGS_ENV_PREFIX", ENV_PREFIX)
+        self._mode_file = None
+        self._watched_mode_file = None
+
+        # With a frozen snapshot (`generate-settings --freeze`) the settings are unpickled from
+        # it instead of parsing `settings.yaml`. A stale snapshot is rebuilt or rejected, without
+        # a `settings.yaml` (e.g. a container that only ships the snapshot) it is used as it is.
+        self.snapshot_file = snapshot_file
+        if on_stale is None:
+            on_stale = os.getenv("SETTINGS_SNAPSHOT_ON_STALE", "rebuild")
+        self.on_stale = on_stale
+
+        # Worker processes attach to the settings published by another process to the
+        # `shared_file` (see `publish`) and only parse `settings.yaml` while none is published
+        if shared_file is None:
+            shared_file = os.getenv("SETTINGS_SHARED_FILE")
+        self.shared_file = shared_file
+        self._publisher = None
+        self._reader = None
+        self._shared_version = None
+
+        # The parsed settings are kept as a snapshot and only re-parsed when the stat of
+        # `settings.yaml` changes. Frozen (e.g. production) configs can skip the check.
+        if check_for_changes is None:
+            check_for_changes = os.getenv("SETTINGS_CHECK_FOR_CHANGES", "1") != "0"
+        self.check_for_changes = check_for_changes
+        self._snapshot = None
+        self._snapshot_stat = None
+        self._index = None
+        self._lock = threading.Lock()
+        self._watcher = None
+        self._subscribers = []
+
+    def _settings_stat(self):
         try:
-            open(os.path.join(self.path, "settings.yaml"))
+            return file_stat_key(self.settings_file)
         except FileNotFoundError:
-            pass
-        
-        with open(os.path.join(self.path, "settings.yaml"), "r") as settings_yml:
-            settings_data = self.yaml.load(settings_yml)
-        settings = from_dict(data_class=RootSchema, data=settings_data)
+            if self.snapshot_file is None:
+                raise
+            return None
+
+    def _stat_key(self, stat_key=_MISSING):
+        if stat_key is _MISSING:
+            stat_key = self._settings_stat()
+        if self._mode_file is None:
+            return stat_key
+        try:
+            return stat_key, file_stat_key(self._mode_file)
+        except OSError:
+            return stat_key, None
+
+    def _shared_reader(self):
+        """The reader of the shared settings, None in the publishing process."""
+        publisher = self._publisher
+        if self.shared_file is None or (publisher is not None and publisher.pid == os.getpid()):
+            return None
+        if self._reader is None:
+            self._reader = SharedSnapshotReader(self.shared_file)
+        return self._reader
+
+    def _parse(self):
+        """Parse `settings.yaml`, or load the frozen snapshot instead."""
+        if self.snapshot_file is not None:
+            return load_snapshot(self.settings_file, self.snapshot_file, on_stale=self.on_stale)
+        return load_yaml(self.settings_file)
+
+    def reload(self) -> RootSchema:
+        """Parse `settings.yaml` (or load the frozen or shared snapshot) again and replace the cached snapshot."""
+        with self._lock:
+            return self._reload()
+
+    def _refresh(self, stale_snapshot: Optional[RootSchema]) -> RootSchema:
+        """Reload after `stale_snapshot` was found stale, unless another thread already replaced it
+        while this one waited for the lock, so threads seeing the same stale stat parse only once.
+        """
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot is not stale_snapshot:
+                return snapshot
+            return self._reload()
+
+    def _reload(self) -> RootSchema:
+        """`reload` with the lock held."""
+        settings_stat = self._settings_stat()
+        stat_key = self._stat_key(settings_stat)
+        reader = self._shared_reader()
+        shared_version, settings_data = reader.read() if reader is not None else (None, None)
+        if settings_data is None:
+            settings_data = self._parse()
+            if self.layered:
+                # Only an existing mode file is checked for changes, that costs a second stat
+                # per access. One created later is picked up with the next reload.
+                mode_file = mode_file_for(self.settings_file, settings_data, self.env_prefix)
+                self._mode_file = mode_file if mode_file is not None and os.path.exists(mode_file) else None
+                # A watcher also notices a mode file that does not exist yet
+                self._watched_mode_file = mode_file
+                if self._watcher is not None:
+                    self._watcher.other_filepaths = self.watched_files()[1:]
+                stat_key = self._stat_key(settings_stat)
+                settings_data = apply_layers(settings_data, self._mode_file, RootSchema, load_yaml,
+                                             self.env_prefix)
+            if reader is None and self._publisher is not None:
+                shared_version = self._publisher.publish(settings_data)
+        settings = _load_RootSchema(settings_data)
+        # The new snapshot is fully built before it is swapped in with a single assignment
+        self._snapshot, self._snapshot_stat, self._shared_version = settings, stat_key, shared_version
 
         return settings
+
+    def publish(self, shared_file: str = None) -> RootSchema:
+        """Publish the settings to `shared_file` for worker processes, e.g. in the gunicorn master
+        before forking. Every later reload of this process publishes a new version.
+        """
+        if shared_file is not None:
+            self.shared_file = shared_file
+        if self.shared_file is None:
+            raise ValueError("No shared file given, pass `shared_file` or set `SETTINGS_SHARED_FILE`")
+        if self._publisher is None or self._publisher.pid != os.getpid():
+            self._publisher = SharedSnapshotPublisher(self.shared_file)
+        return self.reload()
+
+    def watched_files(self) -> list:
+        """`settings.yaml` and, with layered settings, the `settings.<mode>.yaml` of the last
+        reload, which may not exist (yet).
+        """
+        if self._watched_mode_file is None:
+            return [self.settings_file]
+        return [self.settings_file, self._watched_mode_file]
+
+    def watch(self, debounce: float = 0.2, poll_interval: float = 1.0, use_inotify: bool = None) -> SettingsWatcher:
+        """Reload the settings in a background thread whenever `settings.yaml` or the
+        `settings.<mode>.yaml` changes on disk.
+        """
+        if self._watcher is None:
+            if self._snapshot is None:
+                self.reload()
+            watcher = SettingsWatcher(self.settings_file, self._on_file_changed, debounce=debounce,
+                                      poll_interval=poll_interval, use_inotify=use_inotify,
+                                      other_filepaths=self.watched_files()[1:])
+            self._watcher = watcher
+            watcher.start()
+        return self._watcher
+
+    def stop_watching(self):
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+
+    def on_change(self, path: str, callback=None):
+        """Register `callback(old_value, new_value)` for the dotted settings `path`, e.g. `robot.arm`.
+
+        Can also be used as a decorator: `@settings.on_change("robot.arm")`.
+        """
+        if callback is None:
+            return lambda func: self.on_change(path, func)
+        self._subscribers.append((path, callback))
+        return callback
+
+    def _is_stale(self) -> bool:
+        if self._stat_key() != self._snapshot_stat:
+            return True
+        # A mode file created since the last reload is not part of the stat key yet
+        mode_file = self._watched_mode_file
+        return self._mode_file is None and mode_file is not None and os.path.exists(mode_file)
+
+    def _on_file_changed(self):
+        old_snapshot = self._snapshot
+        if not self._is_stale():
+            return
+        new_snapshot = self.reload()
+        old_index = self.path_index_of(old_snapshot)
+        new_index = self.path_index_of(new_snapshot)
+        for path, callback in list(self._subscribers):
+            old_value = old_index.get(path) if path else old_snapshot
+            new_value = new_index.get(path) if path else new_snapshot
+            if old_value == new_value:
+                continue
+            try:
+                callback(old_value, new_value)
+            except Exception:
+                logger.exception(f"Settings change callback for `{path}` failed")
+
+    @property
+    def snapshot(self) -> Optional[RootSchema]:
+        """The last loaded snapshot without checking for changes, None before the first load."""
+        return self._snapshot
+
+    @property
+    def general_settings(self) -> RootSchema:
+        snapshot = self._snapshot
+        if snapshot is None:
+            return self._refresh(None)
+
+        # Workers attached to published settings only compare the version counter, the
+        # publisher is responsible for noticing changes of `settings.yaml`
+        reader = self._shared_reader() if self.shared_file is not None else None
+        if reader is not None:
+            if reader.version() != self._shared_version:
+                return self._refresh(snapshot)
+            if self._shared_version:
+                return snapshot
+
+        # While a watcher is running it is responsible for reloading the snapshot
+        if self.check_for_changes and self._watcher is None:
+            try:
+                is_stale = self._stat_key() != self._snapshot_stat
+            except OSError:
+                # Keep serving the last good snapshot while the file is being replaced
+                is_stale = False
+            if is_stale:
+                return self._refresh(snapshot)
+
+        return snapshot
+
+    def path_index_of(self, snapshot: RootSchema) -> PathIndex:
+        """Mapping from dotted path to value for the given snapshot, one per snapshot. Paths are
+        resolved on their first lookup, so lazy settings only build the sections along them.
+        """
+        cached = self._index
+        if cached is not None and cached.settings is snapshot:
+            return cached
+        index = self._index = PathIndex(snapshot)
+        return index
+
+    @property
+    def path_index(self) -> PathIndex:
+        """Mapping from dotted path (e.g. `robot.arm.speed`) to value for the current snapshot."""
+        snapshot = self.general_settings
+        index = self._index
+        if index is not None and index.settings is snapshot:
+            return index
+        return self.path_index_of(snapshot)
+
+    def get(self, path: str, default=None):
+        return self.path_index.get(path, default)
+
+    def get_many(self, paths, default=None) -> dict:
+        """Look up many dotted paths against one consistent snapshot."""
+        return self.path_index.get_many(paths, default)
+
+    def __getitem__(self, path: str):
+        return self.path_index[path]
+
+    def __contains__(self, path: str) -> bool:
+        return path in self.path_index
     
     @property
     def mode(self):
@@ -82,8 +398,10 @@ class Configurator:
 
 
 class AppSettings(Configurator):
-    def __init__(self, path):
-        super().__init__(path=path)
+    def __init__(self, path, check_for_changes: bool = None, snapshot_file: str = None, on_stale: str = None,
+                 shared_file: str = None, layered: bool = None, env_prefix: str = None):
+        super().__init__(path=path, check_for_changes=check_for_changes, snapshot_file=snapshot_file,
+                         on_stale=on_stale, shared_file=shared_file, layered=layered, env_prefix=env_prefix)
 
     @property
     def root_schema(self) -> RootSchema:
@@ -91,11 +409,17 @@ class AppSettings(Configurator):
 '''
     
     root = os.path.abspath(directory_path)
+    # A mistyped path must not silently become a new project, only its `settings` directory
+    # (and a missing `settings.yaml`) are created
+    if not os.path.isdir(root):
+        raise FileNotFoundError(f'No such project directory: {directory_path}')
 
+    settings_dir = os.path.join(root, 'settings')
     settings_yaml_filepath = os.path.join(root, "settings.yaml")
-    settings_types_filepath = os.path.join(root, 'settings', 'settings_types.py')
+    settings_types_filepath = os.path.join(settings_dir, 'settings_types.py')
+    settings_path = os.path.join(settings_dir, 'application_settings.py')
     if not os.path.exists(settings_types_filepath):
-        os.mkdir(os.path.join(root, 'settings'))
+        os.makedirs(settings_dir, exist_ok=True)
         with open(settings_types_filepath, 'w') as settings_types_file:
             content = '# Generated settings_types file'
             settings_types_file.write(content)
@@ -105,34 +429,154 @@ class AppSettings(Configurator):
             base_content = '# Generated settings.yaml\n\nmode: "development"'
             settings_file.write(base_content)
 
+    # Skip the whole pipeline when the yaml, the generator and its options are the same as
+    # for the last build and the generated files were not touched since
+    with open(settings_yaml_filepath, 'rb') as settings_file:
+        yaml_hash = content_hash(settings_file.read())
+    # The constraints change the generated code like the options do
+    schema_filepath = schema_path_for(settings_yaml_filepath)
+    try:
+        with open(schema_filepath, 'rb') as schema_file:
+            schema_hash = content_hash(schema_file.read())
+    except FileNotFoundError:
+        schema_hash = None
+    options = {'frozen_slots': frozen_slots, 'sample_size': sample_size, 'freeze': freeze, 'instrument': instrument,
+               'lazy': lazy, 'schema_hash': schema_hash}
+    outputs = GENERATED_FILES + (SNAPSHOT_FILENAME,) if freeze else GENERATED_FILES
+    manifest = read_manifest(settings_dir)
+    if not force and is_up_to_date(manifest, yaml_hash, options, settings_dir, outputs):
+        logger.debug("Settings are up to date")
+        return False
+
+    is_generator_changed = force or not is_generator_current(manifest, options)
+
     # Convert the `settings.yaml` to dataclasses (types) if necessary
-    is_schema_updated = smart_schema_update(settings_yaml_filepath, settings_types_filepath)
-    
-    if is_schema_updated:
-        queue = [("root_schema", RootSchema)]
+    if (not is_generator_changed and manifest.get('yaml_hash') == yaml_hash
+            and is_output_intact(manifest, settings_dir, 'settings_types.py')):
+        is_schema_updated = False
+    else:
+        constraints = load_constraints(schema_filepath) if schema_hash is not None else None
+        is_schema_updated = smart_schema_update(settings_yaml_filepath, settings_types_filepath,
+                                                frozen_slots=frozen_slots, sample_size=sample_size, lazy=lazy,
+                                                constraints=constraints)
+
+    is_exported = (is_schema_updated or is_generator_changed
+                   or not is_output_intact(manifest, settings_dir, 'application_settings.py'))
+    if is_exported:
+        # The properties are generated from the generated types, shallower fields win name
+        # clashes and the attributes of `AppSettings` itself are never shadowed
+        settings_types = load_settings_types(settings_types_filepath)
+        property_names = set(re.findall(r"def (\w+)\(", code)) | set(re.findall(r"self\.(\w+) = ", code))
+        if instrument:
+            # Neither are the methods of the instrumentation mixin, e.g. `stats()`
+            from settingsgen.settings_stats import InstrumentedSettings
+            property_names |= {name for name in dir(InstrumentedSettings) if not name.startswith('_')}
+        instrumented_names = set(property_names)
+        instrumented_props = ""
+        queue = [("root_schema", settings_types.RootSchema)]
 
         while queue:
             accessor, current_cls = queue.pop(0)
 
-            props = generate_properties(current_cls, accessor=accessor)
+            props = generate_properties(current_cls, accessor=accessor, property_names=property_names)
             code += props
+            if instrument:
+                instrumented_props += generate_properties(current_cls, accessor=accessor,
+                                                          property_names=instrumented_names, instrument=True)
 
+            # Lists and optional sections can not be followed by an attribute chain
             type_hints = get_type_hints(current_cls)
             for field_name, field_type in type_hints.items():
-                real_type = field_type
-
-                if get_origin(field_type) in {list, List, Optional}:
-                    real_type = get_args(field_type)[0]
-
-                if is_dataclass_type(real_type):
-                    queue.append((f"{accessor}.{field_name}", real_type))
-
-        settings_path = os.path.join(root, 'settings', 'application_settings.py')
-        code = f"{code}\n\n__settings__ = AppSettings('{root}')"
-        code = f"{code}\nloaded_settings = Configurator('{root}')"
+                if is_dataclass_type(field_type):
+                    queue.append((f"{accessor}.{field_name}", field_type))
+
+        snapshot_argument = f", snapshot_file='{os.path.join(settings_dir, SNAPSHOT_FILENAME)}'" if freeze else ''
+        settings_class, configurator_class = 'AppSettings', 'Configurator'
+        if instrument:
+            # The instrumented properties count their path like `get` and `[]` do
+            instrumented_body = instrumented_props or "\n    pass\n"
+            code = f"{code}\n\n{INSTRUMENTED_CLASSES}{instrumented_body}"
+            settings_class, configurator_class = 'InstrumentedAppSettings', 'InstrumentedConfigurator'
+        code = f"{code}\n\n__settings__ = {settings_class}('{root}'{snapshot_argument})"
+        code = f"{code}\nloaded_settings = {configurator_class}('{root}'{snapshot_argument})"
         with open(settings_path, "w") as settings_file:
             settings_file.write(code)
 
         logger.info("Settings exported")
     else:
         logger.warning("No settings exported")
+
+    # The snapshot holds the values, so unlike the types it changes with every yaml change
+    is_frozen = False
+    if freeze and (is_generator_changed or manifest.get('yaml_hash') != yaml_hash
+                   or not is_output_intact(manifest, settings_dir, SNAPSHOT_FILENAME)):
+        _, is_frozen = write_snapshot(settings_yaml_filepath, os.path.join(settings_dir, SNAPSHOT_FILENAME))
+        if is_frozen:
+            logger.info("Settings snapshot frozen")
+        else:
+            logger.error("Settings snapshot could not be frozen, the settings parse `settings.yaml` at startup")
+
+    write_manifest(settings_dir, yaml_hash, options, outputs)
+
+    return is_schema_updated or is_exported or is_frozen
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='generate-settings',
+                                     description='Generate typed settings from the `settings.yaml` of a project')
+    parser.add_argument('directories', nargs='*', default=[os.getcwd()],
+                        help='Project directories or glob patterns, e.g. `services/*` '
+                             '(default: current directory)')
+    parser.add_argument('--frozen-slots', action='store_true',
+                        help='Generate frozen dataclasses with `__slots__` for the settings types')
+    parser.add_argument('--sample-size', type=int, default=None,
+                        help='Stream the yaml and infer the schema from the first N items of every list')
+    parser.add_argument('--force', action='store_true',
+                        help='Regenerate even if the build manifest says nothing changed')
+    parser.add_argument('--freeze', action='store_true',
+                        help='Also write a snapshot of the parsed settings that is loaded instead of the yaml')
+    parser.add_argument('--instrument', action='store_true',
+                        help='Record access, reload and parse stats in the generated settings')
+    parser.add_argument('--lazy', action='store_true',
+                        help='Build the nested settings types on first access instead of on load')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='Number of worker processes in batch mode (default: number of CPUs)')
+    parser.add_argument('--watch', action='store_true',
+                        help='Keep running and regenerate whenever a `settings.yaml` changes')
+    parser.add_argument('--debounce', type=float, default=0.05,
+                        help='Seconds a `settings.yaml` has to stay unchanged before it is regenerated in '
+                             '`--watch` mode (default: 0.05)')
+    args = parser.parse_args()
+    if args.lazy and args.frozen_slots:
+        parser.error('`--lazy` can not be combined with `--frozen-slots`')
+
+    if args.watch:
+        daemon = GeneratorDaemon(find_projects(args.directories), debounce=args.debounce,
+                                 frozen_slots=args.frozen_slots, sample_size=args.sample_size, force=args.force,
+                                 freeze=args.freeze, instrument=args.instrument, lazy=args.lazy)
+        try:
+            daemon.run()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    if len(args.directories) == 1 and not is_glob_pattern(args.directories[0]):
+        if not os.path.isdir(args.directories[0]):
+            parser.error(f'No such project directory: {args.directories[0]}')
+        generate_app_settings(args.directories[0], frozen_slots=args.frozen_slots, sample_size=args.sample_size,
+                              force=args.force, freeze=args.freeze, instrument=args.instrument,
+                              lazy=args.lazy)
+        return
+
+    start = time.perf_counter()
+    results = generate_many(find_projects(args.directories), max_workers=args.jobs, frozen_slots=args.frozen_slots,
+                            sample_size=args.sample_size, force=args.force, freeze=args.freeze,
+                            instrument=args.instrument, lazy=args.lazy)
+    log_results(results, time.perf_counter() - start)
+
+    if summarize(results)[FAILED]:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
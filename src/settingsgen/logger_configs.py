@@ -1,6 +1,19 @@
 import sys
 import os
+import json
+import time
+import queue
+import atexit
+import random
 import logging
+import threading
+import logging.handlers
+
+from abc import ABC, abstractmethod
+
+from collections import Counter
+
+from dataclasses import asdict, is_dataclass
 
 from load_dotenv import load_dotenv
 
@@ -75,39 +88,297 @@ BG_BRIGHT_WHITE = "\033[107m"
 
 
 class CustomLogFormatter(logging.Formatter):
-    
+    # Colored format per level name, other levels use `DEFAULT_FORMAT`
+    LEVEL_FORMATS = {
+        "DEBUG": f'{DIM}%(asctime)-5s{RESET} {BOLD}{GREEN}[%(levelname)-4s]{RESET}'
+                 f': {BOLD}"%(message)s"{RESET} {DIM}{UNDERLINE}%(name)-0s.%(filename)-5s {RESET}{BOLD}{GREEN}line %(lineno)d{RESET}',
+        "ERROR": f'{DIM}{RED}%(asctime)-5s{RESET} {RED}[%(levelname)-4s]{RESET}'
+                 f': {BOLD}{BRIGHT_RED}"%(message)s"{RESET} {DIM}{RED}{UNDERLINE}%(name)-0s.{BRIGHT_RED}%(filename)-5s  {RESET}{BOLD}{RED}line %(lineno)d{RESET}',
+        "WARNING": f'{DIM}{YELLOW}%(asctime)-5s{RESET} {YELLOW}[%(levelname)-4s]{RESET}'
+                   f': {BOLD}{BRIGHT_YELLOW}"%(message)s"{RESET} {DIM}{YELLOW}{UNDERLINE}%(name)-0s.{BRIGHT_YELLOW}%(filename)-5s {RESET}{BOLD}{YELLOW}line %(lineno)d{RESET}',
+        "INFO": f'{DIM}%(asctime)-5s{RESET} [%(levelname)-4s]'
+                f': {BOLD}"%(message)s"{RESET} {DIM}{UNDERLINE}%(name)-0s.%(filename)-5s  {RESET}line %(lineno)d',
+    }
+    DEFAULT_FORMAT = '%(asctime)-5s : %(levelname)-8s | %(name)-5s.%(filename)-5s ___ %(message)s'
+
+    def __init__(self, fmt=None, datefmt=None, style='%', validate=True):
+        super().__init__(fmt, datefmt, style, validate)
+
+        # One formatter per level is built up front. Rewriting the shared `self._style._fmt`
+        # for every record did redundant work and was not thread-safe.
+        self._formatters = {
+            level_name: logging.Formatter(log_format, datefmt=datefmt)
+            for level_name, log_format in self.LEVEL_FORMATS.items()
+        }
+        self._default_formatter = logging.Formatter(self.DEFAULT_FORMAT, datefmt=datefmt)
+
     def format(self, record):
-        """Manually replace log parts and color them based on log level."""
-        
-        # Adjust the format dynamically based on log level
-        if record.levelname == "DEBUG":
-            log_format = f'{DIM}%(asctime)-5s{RESET} {BOLD}{GREEN}[%(levelname)-4s]{RESET}' \
-                 f': {BOLD}"%(message)s"{RESET} {DIM}{UNDERLINE}%(name)-0s.%(filename)-5s {RESET}{BOLD}{GREEN}line %(lineno)d{RESET}'
-        
-        elif record.levelname == "ERROR":
-            log_format = f'{DIM}{RED}%(asctime)-5s{RESET} {RED}[%(levelname)-4s]{RESET}' \
-                 f': {BOLD}{BRIGHT_RED}"%(message)s"{RESET} {DIM}{RED}{UNDERLINE}%(name)-0s.{BRIGHT_RED}%(filename)-5s  {RESET}{BOLD}{RED}line %(lineno)d{RESET}'
-        
-        elif record.levelname == "WARNING":
-            log_format = f'{DIM}{YELLOW}%(asctime)-5s{RESET} {YELLOW}[%(levelname)-4s]{RESET}' \
-                 f': {BOLD}{BRIGHT_YELLOW}"%(message)s"{RESET} {DIM}{YELLOW}{UNDERLINE}%(name)-0s.{BRIGHT_YELLOW}%(filename)-5s {RESET}{BOLD}{YELLOW}line %(lineno)d{RESET}'
-        
-        elif record.levelname == "INFO":
-            log_format = f'{DIM}%(asctime)-5s{RESET} [%(levelname)-4s]' \
-                 f': {BOLD}"%(message)s"{RESET} {DIM}{UNDERLINE}%(name)-0s.%(filename)-5s  {RESET}line %(lineno)d'
-        
+        """Color the log parts based on the log level."""
+        return self._formatters.get(record.levelname, self._default_formatter).format(record)
+
+
+class JsonLogFormatter(logging.Formatter):
+    """Formats every record as one JSON object per line, for log collection in production.
+
+    With `cache_asctime` the timestamp is only formatted once per second and the
+    milliseconds are appended to the cached string.
+    """
+
+    def __init__(self, datefmt: str = "%Y-%m-%dT%H:%M:%S", cache_asctime: bool = True):
+        super().__init__(datefmt=datefmt)
+        self.cache_asctime = cache_asctime
+        self._cached_time = (None, None)
+
+    def formatTime(self, record, datefmt=None):
+        if not self.cache_asctime:
+            return f'{super().formatTime(record, datefmt)}.{int(record.msecs):03d}'
+
+        second = int(record.created)
+        cached_second, cached_time = self._cached_time
+        if cached_second != second:
+            cached_time = time.strftime(datefmt or self.datefmt, self.converter(record.created))
+            # A single tuple assignment, so other threads never see a mismatched pair
+            self._cached_time = (second, cached_time)
+        return f'{cached_time}.{int(record.msecs):03d}'
+
+    def format(self, record):
+        payload = {
+            'time': self.formatTime(record, self.datefmt),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'file': record.filename,
+            'line': record.lineno,
+        }
+        if record.exc_info:
+            payload['exc_info'] = self.formatException(record.exc_info)
+        if record.stack_info:
+            payload['stack_info'] = self.formatStack(record.stack_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """`QueueHandler` for a bounded queue with a policy for when the queue is full:
+
+    - `drop-oldest`: discard the oldest queued record to make room for the new one
+    - `drop-newest`: discard the new record
+    - `block`: wait until the listener made room
+    """
+    OVERFLOW_POLICIES = ('drop-oldest', 'drop-newest', 'block')
+
+    def __init__(self, log_queue: queue.Queue, overflow_policy: str = 'drop-oldest'):
+        if overflow_policy not in self.OVERFLOW_POLICIES:
+            raise ValueError(f'Unknown overflow policy `{overflow_policy}`, use one of {self.OVERFLOW_POLICIES}')
+        super().__init__(log_queue)
+        self.overflow_policy = overflow_policy
+        self.dropped_records = 0
+
+        # The record is formatted by the handlers of the listener, only merge the message args here
+        self.setFormatter(logging.Formatter('%(message)s'))
+
+    def enqueue(self, record):
+        # Called from `emit` while holding the handler lock, so the counter needs no extra lock
+        if self.overflow_policy == 'block':
+            self.queue.put(record)
+            return
+
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            self.dropped_records += 1
+            if self.overflow_policy == 'drop-newest':
+                return
+
+        try:
+            self.queue.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+
+class BlockingSentinelQueueListener(logging.handlers.QueueListener):
+    """`QueueListener` that waits for room in a full bounded queue to enqueue its stop sentinel."""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+class SuppressingFilter(logging.Filter, ABC):
+    """Base for filters that drop records and periodically log a summary of what they
+    suppressed to the `rl_commons.settingsgen` logger.
+    """
+    report_logger = logging.getLogger('rl_commons.settingsgen')
+
+    def __init__(self, report_interval: float = 60.0):
+        super().__init__()
+        self.report_interval = report_interval
+        self.suppressed_total = 0
+        self._suppressed = Counter()
+        self._last_report = time.monotonic()
+        self._lock = threading.Lock()
+        self._reporting = threading.local()
+
+    @abstractmethod
+    def should_log(self, record) -> bool:
+        """Whether the record passes, called with the lock held."""
+
+    @staticmethod
+    def describe(record) -> str:
+        return f'`{record.name}`'
+
+    def filter(self, record):
+        # The summary records themselves are never suppressed
+        if getattr(self._reporting, 'active', False):
+            return True
+
+        with self._lock:
+            is_logged = self.should_log(record)
+            if not is_logged:
+                self.suppressed_total += 1
+                self._suppressed[self.describe(record)] += 1
+            is_report_due = bool(self._suppressed) and time.monotonic() - self._last_report >= self.report_interval
+
+        if is_report_due:
+            self.report_suppressed()
+        return is_logged
+
+    def report_suppressed(self):
+        """Log how many records were suppressed per logger or call site since the last report."""
+        with self._lock:
+            suppressed, self._suppressed = self._suppressed, Counter()
+            elapsed = time.monotonic() - self._last_report
+            self._last_report = time.monotonic()
+
+        self._reporting.active = True
+        try:
+            for source, count in suppressed.most_common():
+                self.report_logger.warning(f'{type(self).__name__} suppressed {count} records from {source} '
+                                           f'in the last {elapsed:.1f} s')
+        finally:
+            self._reporting.active = False
+
+
+class RateLimitFilter(SuppressingFilter):
+    """Token bucket rate limit of `rate` records per second with bursts up to `burst` records,
+    per logger name (`per='logger'`) or per call site (`per='call_site'`).
+    """
+    KEYS = ('logger', 'call_site')
+
+    def __init__(self, rate: float, burst: int = None, per: str = 'logger', report_interval: float = 60.0):
+        if per not in self.KEYS:
+            raise ValueError(f'Unknown rate limit key `{per}`, use one of {self.KEYS}')
+        super().__init__(report_interval=report_interval)
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(rate, 1))
+        self.per = per
+        self._buckets = {}
+
+    def describe(self, record) -> str:
+        if self.per == 'call_site':
+            return f'{record.pathname}:{record.lineno}'
+        return f'`{record.name}`'
+
+    def should_log(self, record) -> bool:
+        key = (record.pathname, record.lineno) if self.per == 'call_site' else record.name
+        now = time.monotonic()
+        tokens, last = self._buckets.get(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - last) * self.rate)
+        if tokens < 1:
+            self._buckets[key] = (tokens, now)
+            return False
+        self._buckets[key] = (tokens - 1, now)
+        return True
+
+
+class SamplingFilter(SuppressingFilter):
+    """Keeps a random `probability` fraction of the records below `min_level`, records at or
+    above `min_level` are always kept.
+    """
+
+    def __init__(self, probability: float, min_level=logging.WARNING, report_interval: float = 60.0):
+        super().__init__(report_interval=report_interval)
+        self.probability = probability
+        self.min_level = logging.getLevelName(min_level) if isinstance(min_level, str) else min_level
+        self._random = random.Random()
+
+    def should_log(self, record) -> bool:
+        return record.levelno >= self.min_level or self._random.random() < self.probability
+
+
+class PackageFilter(logging.Filter):
+    """Applies the `filters` only to the records of the `package` logger and its children."""
+
+    def __init__(self, package: str, filters):
+        super().__init__()
+        self.package = package
+        self.prefix = f'{package}.'
+        self.filters = list(filters)
+
+    def filter(self, record):
+        if record.name != self.package and not record.name.startswith(self.prefix):
+            return True
+        return all(record_filter.filter(record) for record_filter in self.filters)
+
+
+def filters_from_options(options: dict) -> list:
+    """Build the rate limit and sampling filters of a `logging:` style options dict:
+
+        rate_limit: {rate: 100, burst: 200, per: logger}   # per: logger or call_site
+        sampling: {probability: 0.1, min_level: WARNING}
+        report_interval: 60
+    """
+    report_interval = options.get('report_interval', 60.0)
+    filters = []
+
+    rate_limit = options.get('rate_limit')
+    if rate_limit:
+        filters.append(RateLimitFilter(rate=rate_limit['rate'], burst=rate_limit.get('burst'),
+                                       per=rate_limit.get('per', 'logger'), report_interval=report_interval))
+
+    sampling = options.get('sampling')
+    if sampling:
+        filters.append(SamplingFilter(probability=sampling['probability'],
+                                      min_level=sampling.get('min_level', logging.WARNING),
+                                      report_interval=report_interval))
+    return filters
+
+
+def package_options(packages) -> dict:
+    """Map the logger names of the `packages` in a `logging:` section to their options.
+
+    `packages` is a list of names (`[urllib3]`), a list of entries with a `name` and their
+    options (`[{name: botocore.credentials, sampling: {probability: 0.01}}]`) or a mapping from
+    name to options. Dotted logger names need the entry form, they are no valid field names of
+    the generated settings types.
+    """
+    if not packages:
+        return {}
+    if isinstance(packages, dict):
+        return {name: options or {} for name, options in packages.items()}
+
+    options = {}
+    for entry in packages:
+        if isinstance(entry, str):
+            options[entry] = {}
+        elif isinstance(entry, dict) and entry.get('name'):
+            options[entry['name']] = {key: value for key, value in entry.items() if key != 'name'}
         else:
-            log_format = '%(asctime)-5s : %(levelname)-8s | %(name)-5s.%(filename)-5s ___ %(message)s'
+            raise ValueError(f'`logging.packages` entries should be logger names or have a `name`, got {entry!r}')
+    return options
 
-        self._style._fmt = log_format
-        return super().format(record)
-    
 
 class AppLogger:
     LOG_FORMAT_DEBUG = '%(asctime)-5s : %(levelname)-8s | %(name)-5s.%(filename)-5s :: %(message)s'
     LOG_FORMAT_PROD = '%(asctime)-15s %(levelname)s:%(name)s: %(message)s'
     LOG_LEVEL_PROD = logging.WARNING
 
+    # The `AppLogger` whose handler is installed on the root logger
+    _active = None
+
     def __init__(self, settings) -> None:
         """Initialize logging configuration based on the environment."""
         self.settings = settings
@@ -121,23 +392,110 @@ class AppLogger:
         if werkzeug_logger.hasHandlers():
             werkzeug_logger.handlers.clear()
 
-        if self.is_production():
+        options = self.logging_options()
+        if options.get('format') == 'json':
+            formatter = JsonLogFormatter()
+            level = self.LOG_LEVEL_PROD if self.is_production() else logging.DEBUG
+        elif self.is_production():
             formatter = logging.Formatter(self.LOG_FORMAT_PROD, datefmt=self.date_format)
-            self.console_handler.setFormatter(formatter)
-            logging.basicConfig(level=self.LOG_LEVEL_PROD, handlers=[self.console_handler])
+            level = self.LOG_LEVEL_PROD
         else:
             formatter = CustomLogFormatter(self.LOG_FORMAT_DEBUG, datefmt=self.date_format)
-            self.console_handler.setFormatter(formatter)
-            logging.basicConfig(level=logging.DEBUG, handlers=[self.console_handler])
+            level = logging.DEBUG
+        self.console_handler.setFormatter(formatter)
+
+        # With `logging.asynchronous` in the settings, log calls only put the record on a bounded
+        # queue and a listener thread writes them to the console
+        self.queue_handler = None
+        self.queue_listener = None
+        if options.get('asynchronous'):
+            handler = self.start_queue_listener(queue_size=options.get('queue_size', 10000),
+                                                overflow_policy=options.get('overflow_policy', 'drop-oldest'))
+        else:
+            handler = self.console_handler
+
+        # Rate limiting and sampling from the settings, applied before records are queued
+        for record_filter in filters_from_options(options):
+            handler.addFilter(record_filter)
+
+        # Replaces only the handler of a previous `AppLogger` (e.g. the one created on import with
+        # the fallback settings), handlers of the application on the root logger are kept
+        root_logger = logging.getLogger()
+        self.root_handler = handler
+        root_logger.addHandler(handler)
+        root_logger.setLevel(level)
+        previous, AppLogger._active = AppLogger._active, self
+        if previous is not None and previous is not self:
+            previous.remove_root_handler()
+
+        packages = package_options(options.get('packages'))
+        if packages:
+            self.disable_external_package_logging(list(packages), config=packages)
+
+    def logging_options(self) -> dict:
+        """The `logging:` section of `settings.yaml`, empty if the settings do not have one."""
+        general_settings = getattr(self.settings, 'general_settings', None)
+        section = getattr(general_settings, 'logging', None)
+        if is_dataclass(section):
+            return asdict(section)
+        return dict(section) if isinstance(section, dict) else {}
+
+    def start_queue_listener(self, queue_size: int = 10000, overflow_policy: str = 'drop-oldest'):
+        """Route the console output through a bounded queue and a listener thread."""
+        log_queue = queue.Queue(maxsize=queue_size)
+        self.queue_handler = BoundedQueueHandler(log_queue, overflow_policy=overflow_policy)
+        self.queue_listener = BlockingSentinelQueueListener(log_queue, self.console_handler,
+                                                            respect_handler_level=True)
+        self.queue_listener.start()
+
+        # Runs before `logging.shutdown` (atexit is LIFO), so all queued records are written
+        atexit.register(self.stop_queue_listener)
+        return self.queue_handler
+
+    def stop_queue_listener(self):
+        """Flush the queued records and stop the listener thread."""
+        if self.queue_listener is not None:
+            self.queue_listener.stop()
+            self.queue_listener = None
+            self.console_handler.flush()
+
+    def remove_root_handler(self):
+        """Remove and close the handler this `AppLogger` installed on the root logger, after
+        writing the records it still has queued.
+        """
+        self.stop_queue_listener()
+        if self.root_handler is not None:
+            logging.getLogger().removeHandler(self.root_handler)
+            self.root_handler.close()
+            self.root_handler = None
+        self.console_handler.close()
+
+    @property
+    def dropped_records(self) -> int:
+        """Number of records discarded because the log queue was full."""
+        return self.queue_handler.dropped_records if self.queue_handler is not None else 0
 
     def is_production(self) -> bool:
         """Determine if the environment is set to production."""
         return self.settings.mode.lower() == 'production'
     
     @staticmethod
-    def disable_external_package_logging(package_names):
+    def disable_external_package_logging(package_names, config: dict = None):
+        """Silence noisy packages below WARNING, or, for packages with options in `config`
+        (same keys as the `logging:` section, e.g. `{"urllib3": {"sampling": {"probability": 0.01}}}`),
+        rate limit or sample their records instead.
+        """
+        config = config or {}
         for name in package_names:
-            logging.getLogger(name).setLevel(logging.WARNING)
+            filters = filters_from_options(config.get(name) or {})
+            if not filters:
+                logging.getLogger(name).setLevel(logging.WARNING)
+                continue
+
+            # Logger filters do not apply to child loggers, so filter at the root handlers
+            package_filter = PackageFilter(name, filters)
+            for handler in logging.getLogger().handlers:
+                handler.addFilter(package_filter)
 
     @staticmethod
     def is_color_terminal() -> bool:
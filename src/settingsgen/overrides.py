@@ -0,0 +1,176 @@
+"""
+Layered settings overrides.
+
+The parsed `settings.yaml` is overridden by `settings.<mode>.yaml` (when it exists) and then
+by environment variables such as `APP__ROBOT__ARM__SPEED=2.5`. The layers are merged once
+when a settings snapshot is built, not on access.
+
+The environment variables that can override a setting are known from the generated
+dataclass types, so they are precomputed once per class into a map from variable name to
+settings path and type. Building a snapshot then looks up each of those names in
+`os.environ` instead of scanning the whole environment, and the values are coerced to the
+type of the field.
+"""
+import os
+import json
+import typing
+import dataclasses
+
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+
+ENV_PREFIX = 'APP__'
+ENV_SEPARATOR = '__'
+
+TRUE_VALUES = {'1', 'true', 'yes', 'on'}
+FALSE_VALUES = {'0', 'false', 'no', 'off'}
+NONE_VALUES = {'', 'null', 'none', '~'}
+
+_is_dotenv_loaded = False
+
+
+def mode_file_for(settings_file: str, data: Any, prefix: str = ENV_PREFIX) -> Optional[str]:
+    """The `settings.<mode>.yaml` next to `settings_file`, where the mode is the `<prefix>MODE`
+    environment variable or else the `mode` of the parsed settings `data`.
+    """
+    mode = os.environ.get(f'{prefix}MODE') or (data.get('mode') if isinstance(data, dict) else None)
+    if not mode:
+        return None
+    base, extension = os.path.splitext(settings_file)
+    return f'{base}.{mode}{extension}'
+
+
+def deep_merge(base: Any, override: Any) -> Any:
+    """Merge `override` into a copy of `base`, mappings are merged key by key, everything
+    else (including lists) is replaced.
+    """
+    if not isinstance(base, dict) or not isinstance(override, dict):
+        return override
+    merged = dict(base)
+    for key, value in override.items():
+        merged[key] = deep_merge(merged[key], value) if key in merged else value
+    return merged
+
+
+def set_path(data: Any, path: Tuple[str, ...], value: Any) -> Dict[str, Any]:
+    """A copy of the nested mappings `data` with `value` at `path`. Only the mappings along
+    the path are copied and missing ones are created.
+    """
+    data = dict(data) if isinstance(data, dict) else {}
+    data[path[0]] = value if len(path) == 1 else set_path(data.get(path[0]), path[1:], value)
+    return data
+
+
+def coerce(text: str, annotation: Any) -> Any:
+    """Convert the text of an environment variable to the type of a settings field.
+    Raises a ValueError when it does not fit.
+    """
+    origin = typing.get_origin(annotation)
+    if origin is typing.Union:
+        members = typing.get_args(annotation)
+        if type(None) in members and text.strip().lower() in NONE_VALUES:
+            return None
+        for member in members:
+            if member is type(None):
+                continue
+            try:
+                return coerce(text, member)
+            except ValueError:
+                pass
+        raise ValueError(f'{text!r} is none of {annotation}')
+
+    if origin is list:
+        try:
+            items = json.loads(text)
+        except ValueError:
+            items = [item.strip() for item in text.split(',')] if text.strip() else []
+        if not isinstance(items, list):
+            raise ValueError(f'{text!r} is not a list')
+        item_annotation = (typing.get_args(annotation) or (Any,))[0]
+        return [coerce(item, item_annotation) if isinstance(item, str) else item for item in items]
+
+    if annotation is bool:
+        lowered = text.strip().lower()
+        if lowered in TRUE_VALUES:
+            return True
+        if lowered in FALSE_VALUES:
+            return False
+        raise ValueError(f'{text!r} is not a bool')
+    if annotation in (int, float):
+        return annotation(text)
+    if annotation is str:
+        return text
+
+    # Whole sections (dataclasses) and untyped values are given as JSON
+    try:
+        return json.loads(text)
+    except ValueError:
+        if dataclasses.is_dataclass(annotation):
+            raise ValueError(f'{text!r} is not a JSON object') from None
+        return text
+
+
+@lru_cache(maxsize=None)
+def env_path_map(cls: type, prefix: str = ENV_PREFIX) -> Dict[str, Tuple[Tuple[str, ...], Any]]:
+    """Map every environment variable that can override a field of the dataclass `cls` (and
+    its nested dataclasses) to the settings path and the type of that field, e.g.
+    `APP__ROBOT__ARM__SPEED` -> `(('robot', 'arm', 'speed'), float)`.
+    """
+    env_map = {}
+    stack = [(cls, ())]
+    while stack:
+        current_cls, path = stack.pop()
+        for name, annotation in typing.get_type_hints(current_cls).items():
+            field_path = path + (name,)
+            env_map[prefix + ENV_SEPARATOR.join(field_path).upper()] = (field_path, annotation)
+
+            nested = annotation
+            if typing.get_origin(nested) is typing.Union:
+                members = [member for member in typing.get_args(nested) if member is not type(None)]
+                nested = members[0] if len(members) == 1 else None
+            if dataclasses.is_dataclass(nested):
+                stack.append((nested, field_path))
+    return env_map
+
+
+def load_environment():
+    """Load the `.env` file into `os.environ` once, as `logger_configs` does on import."""
+    global _is_dotenv_loaded
+    if not _is_dotenv_loaded:
+        _is_dotenv_loaded = True
+        # Imported here, `load_dotenv` is slow to import and only needed once
+        from load_dotenv import load_dotenv
+        load_dotenv()
+
+
+def apply_env_overrides(data: Dict[str, Any], cls: type, prefix: str = ENV_PREFIX,
+                        environ: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """Override the parsed settings `data` with the environment variables that match a field
+    of `cls`, coerced to the type of that field. Parents are applied before their children.
+    """
+    if environ is None:
+        load_environment()
+        environ = os.environ
+    overrides = []
+    for env_key, (path, annotation) in env_path_map(cls, prefix).items():
+        text = environ.get(env_key)
+        if text is None:
+            continue
+        try:
+            overrides.append((path, coerce(text, annotation)))
+        except ValueError as error:
+            raise ValueError(f'Environment variable `{env_key}` can not override `{".".join(path)}`: {error}') from None
+
+    for path, value in sorted(overrides, key=lambda override: len(override[0])):
+        data = set_path(data, path, value)
+    return data
+
+
+def apply_layers(data: Dict[str, Any], mode_file: Optional[str], cls: type, load: Callable[[str], Any],
+                 prefix: str = ENV_PREFIX) -> Dict[str, Any]:
+    """Merge the layers `settings.yaml` < `settings.<mode>.yaml` < environment variables.
+    The mode file is loaded with `load` and skipped when it does not exist.
+    """
+    if mode_file is not None and os.path.exists(mode_file):
+        data = deep_merge(data, load(mode_file) or {})
+    return apply_env_overrides(data, cls, prefix)
@@ -0,0 +1,186 @@
+from collections.abc import Mapping
+from dataclasses import fields, is_dataclass
+from typing import Any, Dict, Iterable, Iterator, List
+
+_MISSING = object()
+
+
+def _children(node: Any):
+    """The `(name, value)` pairs of a settings node, None for leaves."""
+    if is_dataclass(node) and not isinstance(node, type):
+        return ((field.name, getattr(node, field.name)) for field in fields(node))
+    if isinstance(node, dict):
+        return ((str(key), value) for key, value in node.items())
+    if isinstance(node, list):
+        return ((str(position), value) for position, value in enumerate(node))
+    return None
+
+
+def build_path_index(settings: Any) -> Dict[str, Any]:
+    """Flatten a settings snapshot into a dict from dotted path to value.
+
+    Every node is indexed, not only the leaves, e.g. `robot`, `robot.arm` and
+    `robot.arm.speed`. List items are indexed by position: `robot.waypoints.0.x`.
+    This builds every section of `--lazy` settings, see `PathIndex` for single lookups.
+    """
+    index = {}
+    stack = [("", settings)]
+
+    while stack:
+        prefix, node = stack.pop()
+        children = _children(node)
+        if children is None:
+            continue
+
+        for name, value in children:
+            path = f"{prefix}.{name}" if prefix else name
+            index[path] = value
+            stack.append((path, value))
+
+    return index
+
+
+def _child(node: Any, name: str, default: Any) -> Any:
+    """The child `name` of a settings node (as named in the path index), `default` when there is none."""
+    if is_dataclass(node) and not isinstance(node, type):
+        return getattr(node, name) if name in node.__dataclass_fields__ else default
+    if isinstance(node, dict):
+        value = node.get(name, _MISSING)
+        if value is _MISSING:
+            # Keys that are no strings (e.g. numbers) are indexed by their string
+            value = next((value for key, value in node.items() if str(key) == name), default)
+        return value
+    if isinstance(node, list):
+        if not name.isdigit() or str(int(name)) != name or int(name) >= len(node):
+            return default
+        return node[int(name)]
+    return default
+
+
+def resolve_path(settings: Any, path: str, default: Any = None) -> Any:
+    """The value at the dotted `path` of a settings snapshot, `default` when there is no such
+    path. Only the sections along the path are built in `--lazy` settings.
+    """
+    node = settings
+    for name in path.split("."):
+        node = _child(node, name, _MISSING)
+        if node is _MISSING:
+            return default
+    return node
+
+
+class PathIndex(Mapping):
+    """Mapping from dotted path to value for one settings snapshot.
+
+    Lookups resolve the path on demand and cache the result, so they never build more of
+    `--lazy` settings than the looked up paths. Only iterating over it flattens the whole
+    snapshot with `build_path_index`.
+    """
+
+    def __init__(self, settings: Any):
+        self.settings = settings
+        self._values = {}
+        self._missing = set()
+        self._index = None
+
+    def get(self, path: str, default: Any = None) -> Any:
+        value = self._values.get(path, _MISSING)
+        if value is not _MISSING or path in self._missing:
+            return default if value is _MISSING else value
+        value = resolve_path(self.settings, path, _MISSING)
+        if value is _MISSING:
+            self._missing.add(path)
+            return default
+        self._values[path] = value
+        return value
+
+    def get_many(self, paths: Iterable[str], default: Any = None) -> Dict[str, Any]:
+        paths = list(paths)
+        values = self._values
+        try:
+            # All paths were looked up before in the common case
+            return {path: values[path] for path in paths}
+        except KeyError:
+            return {path: self.get(path, default) for path in paths}
+
+    def __getitem__(self, path: str) -> Any:
+        try:
+            return self._values[path]
+        except KeyError:
+            value = self.get(path, _MISSING)
+        if value is _MISSING:
+            raise KeyError(path)
+        return value
+
+    def __contains__(self, path: object) -> bool:
+        return isinstance(path, str) and self.get(path, _MISSING) is not _MISSING
+
+    def _full_index(self) -> Dict[str, Any]:
+        if self._index is None:
+            self._index = build_path_index(self.settings)
+        return self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._full_index())
+
+    def __len__(self) -> int:
+        return len(self._full_index())
+
+
+def _unbuilt_data(node: Any, name: str) -> Any:
+    """The parsed data of the field `name` of `--lazy` settings while the field is not built
+    yet, otherwise `_MISSING`.
+    """
+    attributes = getattr(node, "__dict__", None)
+    if attributes is None or name in attributes:
+        return _MISSING
+    return attributes.get("_pending", {}).get(name, _MISSING)
+
+
+def _child_names(node: Any):
+    """The names of the children of a settings node, None for leaves."""
+    if is_dataclass(node) and not isinstance(node, type):
+        return [field.name for field in fields(node)]
+    if isinstance(node, dict):
+        return [str(key) for key in node]
+    if isinstance(node, list):
+        return [str(position) for position in range(len(node))]
+    return None
+
+
+def _add_changed_paths(prefix: str, old: Any, new: Any, paths: List[str]) -> bool:
+    """Add the paths below `prefix` whose value differs between `old` and `new` to `paths`,
+    returns whether any did.
+    """
+    # Nodes of the same kind are compared child by child, comparing lazy dataclasses as a
+    # whole would build all of their sections
+    old_names = _child_names(old) if type(old) is type(new) else None
+    if old_names is None:
+        if old == new:
+            return False
+        paths.extend(f"{prefix}.{path}" if prefix else path
+                     for path in build_path_index(old).keys() | build_path_index(new).keys())
+        return True
+
+    known_names = set(old_names)
+    is_changed = False
+    for name in old_names + [name for name in _child_names(new) if name not in known_names]:
+        # Fields not built in either snapshot are compared by their parsed data and stay unbuilt
+        old_data = _unbuilt_data(old, name)
+        if old_data is not _MISSING and old_data == _unbuilt_data(new, name):
+            continue
+        path = f"{prefix}.{name}" if prefix else name
+        if _add_changed_paths(path, _child(old, name, _MISSING), _child(new, name, _MISSING), paths):
+            paths.append(path)
+            is_changed = True
+    return is_changed
+
+
+def changed_paths(old: Any, new: Any) -> List[str]:
+    """The sorted dotted paths whose value differs between two snapshots, parents included.
+    Unchanged sections are skipped, and sections of `--lazy` settings that were built in
+    neither snapshot are compared by their parsed data without building them.
+    """
+    paths = []
+    _add_changed_paths("", old, new, paths)
+    return sorted(paths)
@@ -0,0 +1,206 @@
+"""
+Declarative constraints for the settings, compiled into the generated loader.
+
+The constraints live in a `settings.schema.yaml` sidecar next to `settings.yaml`, keyed by
+dotted settings paths where `*` stands for every item of a list:
+
+    mode:
+      enum: [development, production]
+    robot.arm.speed:
+      min: 0
+      max: 2.5
+    robot.waypoints.*.x:
+      min: 0
+    robot.name:
+      required: true
+      min_length: 1
+
+`generate-settings` checks the paths and constraints against the inferred schema and
+compiles them into a straight-line `_check_constraints(data)` in `settings_types.py`. The
+root loader calls it once per snapshot build, it walks the parsed data once (constraints
+under the same list share one loop) and raises a single `SettingsValidationError` with
+every violation and its dotted path.
+"""
+import os
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from settingsgen.schema_inference import ANY, FLOAT, INT, STR, Shape, members
+
+SCHEMA_FILENAME = 'settings.schema.yaml'
+
+LIST_ITEMS = '*'
+
+CONSTRAINT_TYPES = {
+    'required': (bool,),
+    'enum': (list,),
+    'min': (int, float),
+    'max': (int, float),
+    'min_length': (int,),
+    'max_length': (int,),
+}
+
+Constraints = Dict[Tuple[str, ...], Dict[str, Any]]
+
+
+class SettingsValidationError(ValueError):
+    """Raised with all constraint violations of the settings at once."""
+
+    def __init__(self, errors: List[str]):
+        self.errors = errors
+        super().__init__(f'{len(errors)} settings values violate their constraints:\n'
+                         + '\n'.join(f'  {error}' for error in errors))
+
+
+def schema_path_for(settings_file: str) -> str:
+    """The `settings.schema.yaml` next to `settings_file`."""
+    return os.path.join(os.path.dirname(os.path.abspath(settings_file)), SCHEMA_FILENAME)
+
+
+def parse_constraints(data: Any, source: str = SCHEMA_FILENAME) -> Constraints:
+    """Check the parsed sidecar and map every settings path (as a tuple) to its constraints."""
+    if data is None:
+        return {}
+    if not isinstance(data, dict):
+        raise ValueError(f'`{source}` should map settings paths to constraints')
+
+    constraints = {}
+    for path, path_constraints in data.items():
+        if not isinstance(path, str) or not path or not isinstance(path_constraints, dict):
+            raise ValueError(f'`{source}`: `{path}` should be a dotted settings path mapped to its constraints')
+        for name, value in path_constraints.items():
+            if name not in CONSTRAINT_TYPES:
+                raise ValueError(f'`{source}`: unknown constraint `{name}` for `{path}`, '
+                                 f'use one of {", ".join(CONSTRAINT_TYPES)}')
+            if not isinstance(value, CONSTRAINT_TYPES[name]) or (name != 'required' and isinstance(value, bool)):
+                raise ValueError(f'`{source}`: the `{name}` constraint of `{path}` has the wrong type: {value!r}')
+        if not path_constraints.get('enum', [None]):
+            raise ValueError(f'`{source}`: the `enum` of `{path}` is empty')
+        constraints[tuple(path.split('.'))] = path_constraints
+    return constraints
+
+
+def load_constraints(schema_path: str) -> Optional[Constraints]:
+    """The constraints of a `settings.schema.yaml`, None when there is no such file."""
+    # Imported here, the generated code only needs `SettingsValidationError`
+    from settingsgen.yaml_loader import parse_yaml
+
+    try:
+        with open(schema_path, 'rb') as schema_file:
+            content = schema_file.read()
+    except FileNotFoundError:
+        return None
+    return parse_constraints(parse_yaml(content), os.path.basename(schema_path))
+
+
+def resolve_shape(shape: Shape, path: Tuple[str, ...]) -> Shape:
+    """The shape of the settings at `path`, raises a ValueError when the schema has no such path."""
+    for position, part in enumerate(path):
+        if shape == ANY:
+            return ANY
+        found = None
+        for member in members(shape):
+            if part == LIST_ITEMS and member[0] == 'list':
+                found = member[1]
+            elif part != LIST_ITEMS and member[0] == 'dict':
+                found = next((value_shape for key, value_shape, _ in member[1] if key == part), None)
+        if found is None:
+            raise ValueError(f'`{".".join(path[:position + 1])}` is not a settings path of `settings.yaml`')
+        shape = found
+    return shape
+
+
+def check_constraints(constraints: Constraints, root_shape: Shape):
+    """Raise a ValueError for constraints on paths that do not exist or do not fit the type."""
+    for path, path_constraints in constraints.items():
+        shape = resolve_shape(root_shape, path)
+        if shape == ANY:
+            continue
+        kinds = {member[0] for member in members(shape)}
+        if ('min' in path_constraints or 'max' in path_constraints) and not kinds & {INT[0], FLOAT[0]}:
+            raise ValueError(f'`{".".join(path)}` is not a number, it can not have `min` or `max`')
+        if ('min_length' in path_constraints or 'max_length' in path_constraints) and not kinds & {STR[0], 'list'}:
+            raise ValueError(f'`{".".join(path)}` is not a string or list, it can not have `min_length` '
+                             f'or `max_length`')
+
+
+def _literal(text: str) -> str:
+    """Escape text for an f-string."""
+    return text.replace('{', '{{').replace('}', '}}')
+
+
+def _constraint_lines(constraints: Dict[str, Any], value: str, path: str, indent: str) -> List[str]:
+    lines = []
+    if 'enum' in constraints:
+        options = tuple(constraints['enum'])
+        lines.append(f'{indent}if {value} not in {options!r}:')
+        lines.append(f'{indent}    errors.append(f{repr(f"`{path}` should be one of {_literal(repr(list(options)))}, got {{{value}!r}}")})')
+    for name, operator, relation in (('min', '<', '>='), ('max', '>', '<=')):
+        if name in constraints:
+            limit = constraints[name]
+            lines.append(f'{indent}if isinstance({value}, (int, float)) and {value} {operator} {limit!r}:')
+            lines.append(f'{indent}    errors.append(f{repr(f"`{path}` should be {relation} {limit!r}, got {{{value}!r}}")})')
+    for name, operator, relation in (('min_length', '<', 'at least'), ('max_length', '>', 'at most')):
+        if name in constraints:
+            limit = constraints[name]
+            lines.append(f'{indent}if isinstance({value}, (str, list)) and len({value}) {operator} {limit!r}:')
+            lines.append(f'{indent}    errors.append(f{repr(f"`{path}` should have a length of {relation} {limit!r}, got {{len({value})}}")})')
+    return lines
+
+
+def compile_constraints(constraints: Constraints) -> str:
+    """Generate the `_check_constraints(data)` function that checks all `constraints` in one
+    pass over the parsed settings data.
+    """
+    # Paths sharing a prefix share the lookups (and the loops over lists) of that prefix
+    tree = {}
+    for path, path_constraints in constraints.items():
+        node = tree
+        for part in path:
+            node = node.setdefault(part, {})
+        node[None] = path_constraints
+
+    lines = ['def _check_constraints(data: Any):',
+             '    """Check the constraints of `settings.schema.yaml`, raising all violations at once."""',
+             '    errors = []']
+    counter = [0]
+
+    def next_name(prefix: str) -> str:
+        counter[0] += 1
+        return f'{prefix}{counter[0]}'
+
+    def visit(node: dict, value: str, path: str, indent: str):
+        keys = [key for key in node if key is not None and key != LIST_ITEMS]
+        if keys:
+            lines.append(f'{indent}if isinstance({value}, dict):')
+            for key in keys:
+                child = node[key]
+                child_value = next_name('value')
+                child_path = f'{path}.{_literal(key)}' if path else _literal(key)
+                lines.append(f'{indent}    {child_value} = {value}.get({key!r})')
+                visit_constraints(child, child_value, child_path, indent + '    ')
+        if LIST_ITEMS in node:
+            child = node[LIST_ITEMS]
+            position, child_value = next_name('position'), next_name('item')
+            lines.append(f'{indent}if isinstance({value}, list):')
+            lines.append(f'{indent}    for {position}, {child_value} in enumerate({value}):')
+            visit_constraints(child, child_value, f'{path}.{{{position}}}', indent + '        ')
+
+    def visit_constraints(node: dict, value: str, path: str, indent: str):
+        path_constraints = node.get(None, {})
+        checks = _constraint_lines(path_constraints, value, path, indent + '    ')
+        if path_constraints.get('required'):
+            lines.append(f'{indent}if {value} is None:')
+            lines.append(f'{indent}    errors.append(f{repr(f"`{path}` is required")})')
+            if checks:
+                lines.append(f'{indent}else:')
+                lines.extend(checks)
+        elif checks:
+            lines.append(f'{indent}if {value} is not None:')
+            lines.extend(checks)
+        visit(node, value, path, indent)
+
+    visit(tree, 'data', '', '    ')
+    lines.append('    if errors:')
+    lines.append('        raise SettingsValidationError(errors)')
+    return '\n'.join(lines)
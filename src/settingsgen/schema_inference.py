@@ -0,0 +1,134 @@
+"""
+Structural schema inference for parsed YAML data.
+
+Every value is described by a hashable shape tuple:
+
+- scalars: `('str',)`, `('int',)`, `('float',)`, `('bool',)`, `('none',)` and `('any',)`
+- lists: `('list', item_shape)`, where the item shape of an empty list is `('empty',)`
+- mappings: `('dict', ((key, shape, required), ...))` in the order the keys were first seen
+- unions: `('union', (shape, ...))` with at most one list and one mapping member
+
+The shapes of all items of a list are unified into one shape: keys that are missing in some
+items become optional, `int` and `float` widen to `float`, and other differing types become
+unions. Identical item shapes are deduplicated before unifying and `unify` is memoized, so
+lists of many equally shaped items are only unified once.
+"""
+from functools import lru_cache
+from typing import Any, Iterable, Tuple
+
+Shape = Tuple
+
+STR = ('str',)
+INT = ('int',)
+FLOAT = ('float',)
+BOOL = ('bool',)
+NONE = ('none',)
+ANY = ('any',)
+EMPTY = ('empty',)
+
+# Order of the members of a union, so equal unions always have the same shape
+KIND_ORDER = {'bool': 0, 'int': 1, 'float': 2, 'str': 3, 'list': 4, 'dict': 5, 'none': 6}
+
+
+# Exact types of the scalars the yaml loaders construct, looked up by `type(value)` which is
+# much faster than a chain of `isinstance` checks for lists of many items
+SCALAR_SHAPES = {str: STR, int: INT, float: FLOAT, bool: BOOL, type(None): NONE}
+
+
+def infer_shape(value: Any) -> Shape:
+    """Infer the shape of a parsed YAML value, unifying the shapes of all list items."""
+    shape = SCALAR_SHAPES.get(type(value))
+    if shape is not None:
+        return shape
+    if isinstance(value, dict):
+        return ('dict', tuple((key, infer_shape(item), True) for key, item in value.items()))
+    if isinstance(value, list):
+        return ('list', unify_all(infer_shape(item) for item in value))
+    # Subclasses of the scalar types, `bool` before `int` since it is a subclass of `int`
+    for scalar_type in (bool, int, float, str):
+        if isinstance(value, scalar_type):
+            return SCALAR_SHAPES[scalar_type]
+    return ANY
+
+
+def unify_all(shapes: Iterable[Shape]) -> Shape:
+    """Unify many shapes into one, `EMPTY` when there are none."""
+    result = EMPTY
+    # Deduplicated first (in order of appearance), equal shapes only need to be unified once
+    for shape in dict.fromkeys(shapes):
+        result = unify(result, shape)
+    return result
+
+
+def members(shape: Shape) -> Tuple[Shape, ...]:
+    return shape[1] if shape[0] == 'union' else (shape,)
+
+
+@lru_cache(maxsize=4096)
+def unify(first: Shape, second: Shape) -> Shape:
+    """The most specific shape that describes values of both shapes."""
+    if first == second or second == EMPTY:
+        return first
+    if first == EMPTY:
+        return second
+    if first == ANY or second == ANY:
+        return ANY
+
+    scalars = []
+    list_shape = None
+    dict_shape = None
+    for member in members(first) + members(second):
+        kind = member[0]
+        if kind == 'dict':
+            dict_shape = member if dict_shape is None else _unify_dicts(dict_shape, member)
+        elif kind == 'list':
+            list_shape = member if list_shape is None else ('list', unify(list_shape[1], member[1]))
+        elif member not in scalars:
+            scalars.append(member)
+
+    # Numeric widening
+    if INT in scalars and FLOAT in scalars:
+        scalars.remove(INT)
+
+    result = scalars + [shape for shape in (list_shape, dict_shape) if shape is not None]
+    if len(result) == 1:
+        return result[0]
+    return ('union', tuple(sorted(result, key=lambda member: KIND_ORDER[member[0]])))
+
+
+def _unify_dicts(first: Shape, second: Shape) -> Shape:
+    fields = {key: [shape, required] for key, shape, required in first[1]}
+    second_keys = set()
+    for key, shape, required in second[1]:
+        second_keys.add(key)
+        if key in fields:
+            fields[key][0] = unify(fields[key][0], shape)
+            fields[key][1] = fields[key][1] and required
+        else:
+            fields[key] = [shape, False]
+
+    # Keys that are missing in one of the mappings are optional
+    for key, field in fields.items():
+        if key not in second_keys:
+            field[1] = False
+
+    return ('dict', tuple((key, shape, required) for key, (shape, required) in fields.items()))
+
+
+def is_nullable(shape: Shape) -> bool:
+    return shape == NONE or NONE in members(shape)
+
+
+def without_none(shape: Shape) -> Shape:
+    """The shape without its `None` member, `NONE` itself when nothing else is left."""
+    if shape[0] != 'union':
+        return shape
+    rest = tuple(member for member in shape[1] if member != NONE)
+    if len(rest) == 1:
+        return rest[0]
+    return ('union', rest)
+
+
+def is_class_shape(shape: Shape) -> bool:
+    """Non-empty mappings become dataclasses, empty ones stay `Optional[Any]`."""
+    return shape[0] == 'dict' and bool(shape[1])
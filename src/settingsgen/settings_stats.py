@@ -0,0 +1,194 @@
+"""
+Access instrumentation for the generated settings.
+
+`generate-settings --instrument` generates `InstrumentedAppSettings` and
+`InstrumentedConfigurator`, which add the `InstrumentedSettings` mixin to the generated
+classes and are used for `__settings__` and `loaded_settings`. Without the flag the
+generated settings contain no instrumentation at all, so it costs nothing when disabled.
+"""
+import os
+import time
+import logging
+import threading
+
+from collections import Counter
+from typing import Any, Dict
+
+logger = logging.getLogger('rl_commons.settingsgen')
+
+# Number of paths listed in the periodic log line
+TOP_PATHS = 5
+
+
+class DurationStats:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def record(self, duration: float):
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+        self.last = duration
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'total_s': self.total,
+            'mean_s': self.total / self.count if self.count else 0.0,
+            'max_s': self.max,
+            'last_s': self.last,
+        }
+
+
+class SettingsStats:
+    """Thread-safe counters of the settings accesses, reloads and parses."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reporter = None
+        self._stop_reporting = threading.Event()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.paths = Counter()
+            self.hits = 0
+            self.misses = 0
+            self.reloads = DurationStats()
+            self.parses = DurationStats()
+
+    def record_path(self, path: str):
+        with self._lock:
+            self.paths[path] += 1
+
+    def record_paths(self, paths):
+        with self._lock:
+            self.paths.update(paths)
+
+    def record_snapshot(self, is_hit: bool):
+        with self._lock:
+            if is_hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def record_reload(self, duration: float):
+        with self._lock:
+            self.reloads.record(duration)
+
+    def record_parse(self, duration: float):
+        with self._lock:
+            self.parses.record(duration)
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'path_accesses': sum(self.paths.values()),
+                'paths': dict(self.paths.most_common()),
+                'cache_hits': self.hits,
+                'cache_misses': self.misses,
+                'cache_hit_rate': self.hits / lookups if lookups else 0.0,
+                'reloads': self.reloads.as_dict(),
+                'parses': self.parses.as_dict(),
+            }
+
+    def describe(self) -> str:
+        stats = self.as_dict()
+        top_paths = ', '.join(f'{path}={count}' for path, count in list(stats['paths'].items())[:TOP_PATHS])
+        return (f"{stats['path_accesses']} path accesses, {stats['cache_hit_rate']:.1%} of "
+                f"{stats['cache_hits'] + stats['cache_misses']} snapshot lookups cached, "
+                f"{stats['reloads']['count']} reloads (mean {stats['reloads']['mean_s'] * 1000:.2f} ms), "
+                f"{stats['parses']['count']} parses (mean {stats['parses']['mean_s'] * 1000:.2f} ms)"
+                + (f', top paths: {top_paths}' if top_paths else ''))
+
+    def start_reporting(self, interval: float):
+        """Log the stats through the `rl_commons.settingsgen` logger every `interval` seconds."""
+        if self._reporter is not None:
+            return
+        self._stop_reporting.clear()
+        self._reporter = threading.Thread(target=self._report, args=(interval,), name='settings-stats', daemon=True)
+        self._reporter.start()
+
+    def stop_reporting(self):
+        if self._reporter is not None:
+            self._stop_reporting.set()
+            self._reporter.join()
+            self._reporter = None
+
+    def _report(self, interval: float):
+        last_description = SettingsStats().describe()
+        while not self._stop_reporting.wait(interval):
+            # Idle settings (e.g. an unused `loaded_settings`) do not repeat the same line
+            description = self.describe()
+            if description != last_description:
+                logger.info(f'Settings stats: {description}')
+                last_description = description
+
+
+class InstrumentedSettings:
+    """Mixin for the generated `Configurator` classes that records the per path access
+    counts, the reload and parse durations and the snapshot cache hits and misses.
+
+    `stats_interval` (or the `SETTINGS_STATS_INTERVAL` environment variable) in seconds
+    enables a periodic log line with the stats.
+    """
+
+    def __init__(self, *args, stats_interval: float = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats = SettingsStats()
+        if stats_interval is None:
+            stats_interval = float(os.getenv('SETTINGS_STATS_INTERVAL', '0'))
+        if stats_interval > 0:
+            self._stats.start_reporting(stats_interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return self._stats.as_dict()
+
+    def reset_stats(self):
+        self._stats.reset()
+
+    def stop_reporting(self):
+        self._stats.stop_reporting()
+
+    def _parse(self):
+        start = time.perf_counter()
+        try:
+            return super()._parse()
+        finally:
+            self._stats.record_parse(time.perf_counter() - start)
+
+    def _reload(self):
+        # Timed below `reload`, so the reloads started by `general_settings` count as well
+        start = time.perf_counter()
+        try:
+            return super()._reload()
+        finally:
+            self._stats.record_reload(time.perf_counter() - start)
+
+    @property
+    def general_settings(self):
+        snapshot = self._snapshot
+        settings = super().general_settings
+        self._stats.record_snapshot(snapshot is not None and settings is snapshot)
+        return settings
+
+    def get(self, path: str, default=None):
+        self._stats.record_path(path)
+        return super().get(path, default)
+
+    def get_many(self, paths, default=None) -> dict:
+        paths = list(paths)
+        self._stats.record_paths(paths)
+        return super().get_many(paths, default)
+
+    def __getitem__(self, path: str):
+        self._stats.record_path(path)
+        return super().__getitem__(path)
+
+    def __contains__(self, path: str) -> bool:
+        self._stats.record_path(path)
+        return super().__contains__(path)
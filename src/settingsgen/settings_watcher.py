@@ -0,0 +1,211 @@
+import os
+import sys
+import select
+import struct
+import ctypes
+import ctypes.util
+import logging
+import threading
+
+from typing import Callable, Iterable, Optional
+
+logger = logging.getLogger('rl_commons.settingsgen')
+
+# inotify(7) constants, see <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, 'O_CLOEXEC', 0o2000000)
+
+INOTIFY_EVENT = struct.Struct('iIII')
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+
+def _load_inotify():
+    """Return libc when the inotify API is available, otherwise None."""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+def file_stat_key(filepath: str):
+    """The part of the file stat that changes when the file is written or replaced."""
+    stat = os.stat(filepath)
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+class SettingsWatcher:
+    """Watches a file in a background thread and calls `callback` once a burst of writes has
+    settled for `debounce` seconds.
+
+    `other_filepaths` are watched as well, e.g. the `settings.<mode>.yaml` next to
+    `settings.yaml`. They have to be in the same directory as `filepath`, may not exist (yet)
+    and can be replaced while the watcher runs.
+
+    Uses inotify on Linux and falls back to polling the file stat every `poll_interval`
+    seconds on other platforms (or when `use_inotify` is False).
+    """
+
+    def __init__(self, filepath: str, callback: Callable[[], None], debounce: float = 0.2,
+                 poll_interval: float = 1.0, use_inotify: Optional[bool] = None, other_filepaths: Iterable[str] = ()):
+        self.filepath = os.path.abspath(filepath)
+        self.other_filepaths = other_filepaths
+        self.callback = callback
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+
+        self._libc = _load_inotify() if use_inotify in (None, True) else None
+        if use_inotify and self._libc is None:
+            logger.warning('inotify is not available, falling back to polling `%s`', self.filepath)
+
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def other_filepaths(self) -> tuple:
+        return self._other_filepaths
+
+    @other_filepaths.setter
+    def other_filepaths(self, filepaths: Iterable[str]):
+        filepaths = tuple(os.path.abspath(filepath) for filepath in filepaths)
+        directory = os.path.dirname(self.filepath)
+        for filepath in filepaths:
+            if os.path.dirname(filepath) != directory:
+                raise ValueError(f'`{filepath}` is not in the directory of `{self.filepath}`')
+        # Replaced with a single assignment, the watcher thread reads it per event
+        self._other_filepaths = filepaths
+
+    def _filenames(self) -> set:
+        return {os.fsencode(os.path.basename(filepath)) for filepath in (self.filepath, *self._other_filepaths)}
+
+    def _stat_keys(self):
+        """The watched files with their stat keys, raises an OSError while `filepath` is missing."""
+        stat_keys = [file_stat_key(self.filepath)]
+        for filepath in self._other_filepaths:
+            try:
+                stat_keys.append(file_stat_key(filepath))
+            except OSError:
+                stat_keys.append(None)
+        return self._other_filepaths, tuple(stat_keys)
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._libc is not None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.is_running:
+            return self
+
+        self._stop_event.clear()
+        # Set up before returning, so a write right after `start` is not missed
+        fd = self._init_inotify() if self.uses_inotify else None
+        if fd is None:
+            target, args = self._run_polling, (self._initial_stat_keys(),)
+        else:
+            target, args = self._run_inotify, (fd,)
+        self._thread = threading.Thread(target=target, args=args, daemon=True,
+                                        name=f'SettingsWatcher({os.path.basename(self.filepath)})')
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = None):
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+
+    def _fire(self):
+        try:
+            self.callback()
+        except Exception:
+            # A half-written or invalid file must not kill the watcher, the next write retries
+            logger.exception('Reloading `%s` failed', self.filepath)
+
+    def _init_inotify(self) -> Optional[int]:
+        """The inotify fd watching the directory of `filepath`, None when that fails."""
+        libc = self._libc
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            logger.warning('inotify_init1 failed (errno %d), falling back to polling', ctypes.get_errno())
+            return None
+
+        # Watch the directory rather than the file, editors usually replace the file on save
+        directory = os.path.dirname(self.filepath)
+        if libc.inotify_add_watch(fd, os.fsencode(directory), WATCH_MASK) < 0:
+            os.close(fd)
+            logger.warning('inotify_add_watch failed (errno %d), falling back to polling', ctypes.get_errno())
+            return None
+        return fd
+
+    def _run_inotify(self, fd: int):
+        pending = False
+        try:
+            while not self._stop_event.is_set():
+                # While a change is pending, wait at most `debounce` for the next event
+                timeout = self.debounce if pending else 0.5
+                ready, _, _ = select.select([fd], [], [], timeout)
+                if not ready:
+                    if pending:
+                        pending = False
+                        self._fire()
+                    continue
+
+                try:
+                    buffer = os.read(fd, 64 * 1024)
+                except BlockingIOError:
+                    continue
+
+                filenames = self._filenames()
+                offset = 0
+                while offset < len(buffer):
+                    _, _, _, name_length = INOTIFY_EVENT.unpack_from(buffer, offset)
+                    offset += INOTIFY_EVENT.size
+                    name = buffer[offset:offset + name_length].rstrip(b'\0')
+                    offset += name_length
+                    if name in filenames:
+                        pending = True
+        finally:
+            os.close(fd)
+
+    def _initial_stat_keys(self):
+        try:
+            return self._stat_keys()
+        except OSError:
+            return None
+
+    def _run_polling(self, last_seen):
+        while not self._stop_event.wait(self.poll_interval):
+            try:
+                current = self._stat_keys()
+            except OSError:
+                continue
+            if current == last_seen:
+                continue
+
+            # Wait until the file stops changing before firing
+            while not self._stop_event.wait(self.debounce):
+                try:
+                    settled = self._stat_keys()
+                except OSError:
+                    continue
+                if settled == current:
+                    break
+                current = settled
+
+            if self._stop_event.is_set():
+                break
+            last_seen = current
+            self._fire()
@@ -0,0 +1,147 @@
+"""
+Settings snapshots shared between processes through an mmap'd file.
+
+One process (e.g. the gunicorn master) parses the settings and publishes the data into the
+file, the worker processes map it read-only and only unpickle it instead of parsing
+`settings.yaml` each. A version counter in the header works as a seqlock: it is odd while
+the publisher writes, so readers retry instead of reading a half written snapshot, and
+workers notice a new version by reading 8 bytes.
+
+Layout: `magic (8 bytes) | version (uint64) | payload length (uint64) | pickle payload`.
+The file only ever grows, so readers that still map an older size never read past its end.
+"""
+import os
+import mmap
+import time
+import struct
+import pickle
+import logging
+
+from typing import Any, Optional, Tuple
+
+logger = logging.getLogger('rl_commons.settingsgen')
+
+MAGIC = b'STGSNAP2'
+HEADER = struct.Struct('<8sQQ')
+VERSION = struct.Struct('<Q')
+VERSION_OFFSET = 8
+
+# A reader gives up after this many attempts when the publisher does not finish a write,
+# e.g. because it died while writing
+MAX_READ_ATTEMPTS = 1000
+
+
+class SharedSnapshotPublisher:
+    """Writes settings snapshots into the shared file, only in the process that created it."""
+
+    def __init__(self, path: str):
+        self.path = os.path.abspath(path)
+        self.pid = os.getpid()
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if os.fstat(self._fd).st_size < HEADER.size:
+            os.ftruncate(self._fd, HEADER.size)
+        self._map = mmap.mmap(self._fd, 0)
+        # An existing file keeps counting, so workers attached to it notice the next version
+        if self._map[:len(MAGIC)] != MAGIC:
+            self._map[:HEADER.size] = HEADER.pack(MAGIC, 0, 0)
+
+    @property
+    def version(self) -> int:
+        return VERSION.unpack_from(self._map, VERSION_OFFSET)[0]
+
+    def publish(self, data: Any) -> Optional[int]:
+        """Write the parsed settings data as the next version and return that version.
+        Returns None when the data can not be pickled, the workers then keep parsing the yaml.
+        """
+        try:
+            payload = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        except pickle.PicklingError as error:
+            logger.warning(f'Could not publish the settings to `{self.path}`: {error}')
+            return None
+        size = HEADER.size + len(payload)
+        if size > len(self._map):
+            os.ftruncate(self._fd, size)
+            self._map.close()
+            self._map = mmap.mmap(self._fd, 0)
+
+        # Odd while writing, readers retry until the version is even and unchanged
+        version = self.version | 1
+        VERSION.pack_into(self._map, VERSION_OFFSET, version)
+        HEADER.pack_into(self._map, 0, MAGIC, version, len(payload))
+        self._map[HEADER.size:size] = payload
+        VERSION.pack_into(self._map, VERSION_OFFSET, version + 1)
+        return version + 1
+
+    def close(self):
+        self._map.close()
+        os.close(self._fd)
+
+
+class SharedSnapshotReader:
+    """Maps the shared file read-only, attaching lazily once the publisher created it."""
+
+    def __init__(self, path: str):
+        self.path = os.path.abspath(path)
+        self._map = None
+
+    def _attach(self, size: int = 0) -> Optional[mmap.mmap]:
+        if self._map is not None and len(self._map) >= size:
+            return self._map
+        try:
+            fd = os.open(self.path, os.O_RDONLY)
+        except OSError:
+            return None
+        try:
+            if os.fstat(fd).st_size < max(size, HEADER.size):
+                return None
+            shared_map = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        finally:
+            os.close(fd)
+        if shared_map[:len(MAGIC)] != MAGIC:
+            shared_map.close()
+            return None
+        if self._map is not None:
+            self._map.close()
+        self._map = shared_map
+        return shared_map
+
+    def version(self) -> int:
+        """The published version, 0 when nothing was published yet."""
+        shared_map = self._attach()
+        if shared_map is None:
+            return 0
+        return VERSION.unpack_from(shared_map, VERSION_OFFSET)[0]
+
+    def read(self) -> Tuple[int, Any]:
+        """The `(version, data)` of the published snapshot. The data is None when nothing
+        was published yet or the publisher did not finish its write.
+        """
+        version = 0
+        for _ in range(MAX_READ_ATTEMPTS):
+            shared_map = self._attach()
+            if shared_map is None:
+                return 0, None
+            _, version, length = HEADER.unpack_from(shared_map)
+            if version == 0:
+                return 0, None
+            if version % 2:
+                time.sleep(0)
+                continue
+            if HEADER.size + length > len(shared_map):
+                # The publisher grew the file since it was mapped
+                if self._attach(HEADER.size + length) is None:
+                    return 0, None
+                continue
+
+            payload = shared_map[HEADER.size:HEADER.size + length]
+            if VERSION.unpack_from(shared_map, VERSION_OFFSET)[0] == version:
+                return version, pickle.loads(payload)
+
+        logger.warning(f'The shared settings snapshot `{self.path}` is still being written after '
+                       f'{MAX_READ_ATTEMPTS} attempts')
+        return version, None
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
@@ -2,7 +2,8 @@ import logging
 import ast
 import os
 from settingsgen.logger_configs import logger
-from settingsgen.yaml_to_dataclass import generate_dataclass_file
+from settingsgen.yaml_to_dataclass import (FINGERPRINT_PREFIX, SchemaModel, generate_dataclass_file,
+                                             read_fingerprint)
 import settingsgen.settings_types as st
 
 logger = logging.getLogger('rl_commons.settingsgen')
@@ -12,6 +13,8 @@ def extract_summary(source_code: str):
     tree = ast.parse(source_code)
     classes = {}
     imports = set()
+    # The bodies are compared too, e.g. the compiled constraints only change a function body
+    functions = {node.name: ast.dump(node) for node in tree.body if isinstance(node, ast.FunctionDef)}
 
     for node in ast.walk(tree):
         if isinstance(node, ast.Import):
@@ -37,27 +40,53 @@ def extract_summary(source_code: str):
                             attributes[field_name] = 'Any'  # No type info available
 
             classes[node.name] = {
+                'decorators': [ast.unparse(decorator) for decorator in node.decorator_list],
                 'methods': sorted(method_names),
                 'attributes': attributes,
             }
 
     return {
         'imports': sorted(imports),
+        'functions': functions,
         'classes': classes,
     }
 
 
-def should_save_file(existing_content: str, new_content: str) -> bool:
-    existing_summary = extract_summary(existing_content) if existing_content else None
-    new_summary = extract_summary(new_content)
+def schema_model_of(source_code: str) -> SchemaModel:
+    """The `SchemaModel` of existing settings types, read from their code."""
+    classes = extract_summary(source_code)['classes']
+    return SchemaModel({
+        class_name: {name: annotation for name, annotation in summary['attributes'].items()
+                     if not name.startswith('__')}
+        for class_name, summary in classes.items()
+    }, read_fingerprint(source_code))
+
 
-    if not existing_summary:
+def should_save_file(existing_content: str, new_content: str) -> bool:
+    if not existing_content:
         return True  # File doesn't exist
 
+    # Generated code carries the fingerprint of its schema in the header, comparing those
+    # replaces parsing and comparing both files
+    existing_fingerprint = read_fingerprint(existing_content)
+    new_fingerprint = read_fingerprint(new_content)
+    if existing_fingerprint is not None and new_fingerprint is not None:
+        return existing_fingerprint != new_fingerprint
+    if new_fingerprint is not None and not existing_content.startswith(FINGERPRINT_PREFIX):
+        return True  # Generated before the fingerprints, rewritten once to get one
+
+    # Hand edited files are compared by their AST
+    existing_summary = extract_summary(existing_content)
+    new_summary = extract_summary(new_content)
+
     # Compare imports
     if existing_summary['imports'] != new_summary['imports']:
         return True
 
+    # Compare module level functions (e.g. the generated loaders)
+    if existing_summary['functions'] != new_summary['functions']:
+        return True
+
     # Compare class names
     if set(existing_summary['classes'].keys()) != set(new_summary['classes'].keys()):
         return True
@@ -69,6 +98,9 @@ def should_save_file(existing_content: str, new_content: str) -> bool:
         if not new_class:
             return True
 
+        if old_class['decorators'] != new_class['decorators']:
+            return True
+
         if old_class['methods'] != new_class['methods']:
             return True
 
@@ -85,7 +117,10 @@ def should_save_file(existing_content: str, new_content: str) -> bool:
     return False
 
 
-def smart_save_python_file(filepath: str, new_content: str):
+def smart_save_python_file(filepath: str, new_content: str, new_model: SchemaModel = None):
+    """Write `new_content` when it differs meaningfully from the file, the per class changes
+    are logged when the `SchemaModel` of the new content is given.
+    """
     if os.path.exists(filepath):
         with open(filepath, 'r') as f:
             existing_content = f.read()
@@ -93,13 +128,21 @@ def smart_save_python_file(filepath: str, new_content: str):
         existing_content = ""
 
     if should_save_file(existing_content, new_content):
+        if new_model is not None and existing_content:
+            try:
+                changes = schema_model_of(existing_content).diff(new_model)
+            except SyntaxError:
+                changes = []
+            for change in changes:
+                logger.info(f'Settings types: {change}')
         with open(filepath, 'w') as f:
             f.write(new_content)
         return True
     else:
         return False
 
-def smart_schema_update(src_path: str, dist_path: str):
+def smart_schema_update(src_path: str, dist_path: str, frozen_slots: bool = False, sample_size: int = None,
+                        lazy: bool = False, constraints=None):
     """Convert the contents of the settings.yaml file into dataclasses to have the type
     references to each field of the settings
     """
@@ -110,12 +153,14 @@ def smart_schema_update(src_path: str, dist_path: str):
         keys.append(element)
 
     # Generate the new code to compare
-    new_generated_code = generate_dataclass_file(src_path, dist_path)
+    new_generated_code, new_model = generate_dataclass_file(src_path, dist_path, frozen_slots=frozen_slots,
+                                                            sample_size=sample_size, lazy=lazy,
+                                                            constraints=constraints)
 
     # Save the file only if the contents of the new code are changed in a meaningful 
     # way, otherwise, do not write the contents to file. As the settings_types.py is 
     # tracked by Git.
-    is_saved = smart_save_python_file(dist_path, new_generated_code)
+    is_saved = smart_save_python_file(dist_path, new_generated_code, new_model)
     if is_saved:
         logger.info('The settings types schema updated successfully at `settings_types.py`')
     else:
@@ -0,0 +1,88 @@
+"""
+Long-lived `generate-settings --watch` daemon for development.
+
+The interpreter stays warm, so a regeneration after an edit of `settings.yaml` does not pay
+for the interpreter startup and the imports again. Every project gets a `SettingsWatcher`,
+whose debounce coalesces a burst of writes (e.g. an editor saving twice) into one change, and
+the build manifest keeps each regeneration incremental.
+"""
+import os
+import logging
+import threading
+
+from functools import partial
+from typing import Dict, Iterable, List, Optional
+
+from settingsgen.batch_generate import ProjectResult, generate_project, log_result
+from settingsgen.schema_constraints import schema_path_for
+from settingsgen.settings_watcher import SettingsWatcher
+
+logger = logging.getLogger('rl_commons.settingsgen')
+
+
+class GeneratorDaemon:
+    """Regenerates the settings of the project `directories` whenever their `settings.yaml`
+    (or its `settings.schema.yaml`) changes, with the `options` of `generate_app_settings`.
+
+    The projects are generated one after the other in the thread calling `run`, the watcher
+    threads only queue the changed projects. Changes that arrive during a regeneration are
+    picked up right after it.
+    """
+
+    def __init__(self, directories: Iterable[str], debounce: float = 0.05, poll_interval: float = 0.5,
+                 use_inotify: Optional[bool] = None, **options):
+        self.directories = [os.path.abspath(directory) for directory in directories]
+        self.options = options
+        # Insertion ordered, a project changed twice before the next regeneration runs once
+        self._pending: Dict[str, None] = {}
+        self._lock = threading.Lock()
+        self._changed = threading.Event()
+        self._stop_event = threading.Event()
+        self._watchers = []
+        for directory in self.directories:
+            settings_file = os.path.join(directory, 'settings.yaml')
+            self._watchers.append(SettingsWatcher(settings_file, partial(self._on_file_changed, directory),
+                                                  debounce=debounce, poll_interval=poll_interval,
+                                                  use_inotify=use_inotify,
+                                                  other_filepaths=[schema_path_for(settings_file)]))
+
+    def _on_file_changed(self, directory: str):
+        # Called in the watcher threads
+        with self._lock:
+            self._pending[directory] = None
+        self._changed.set()
+
+    def regenerate(self, directories: Iterable[str], **options) -> List[ProjectResult]:
+        """Generate the projects now and log the latency of each."""
+        results = []
+        for directory in directories:
+            result = generate_project(directory, **{**self.options, **options})
+            log_result(result)
+            results.append(result)
+        return results
+
+    def run(self):
+        """Generate all projects once, then regenerate the changed ones until `stop` is called."""
+        # Started before the first generation, so edits made during it are not missed
+        for watcher in self._watchers:
+            watcher.start()
+        try:
+            self.regenerate(self.directories)
+            logger.info(f'Watching the settings of {len(self.directories)} projects for changes')
+
+            while not self._stop_event.is_set():
+                self._changed.wait()
+                with self._lock:
+                    self._changed.clear()
+                    directories, self._pending = list(self._pending), {}
+                if self._stop_event.is_set():
+                    break
+                # `force` only applies to the first generation, later ones stay incremental
+                self.regenerate(directories, force=False)
+        finally:
+            for watcher in self._watchers:
+                watcher.stop()
+
+    def stop(self):
+        self._stop_event.set()
+        self._changed.set()
@@ -0,0 +1,188 @@
+import os
+import pickle
+import hashlib
+import logging
+
+from typing import Any
+
+logger = logging.getLogger('rl_commons.settingsgen')
+
+# Number of items per list that `load_yaml_sample` materializes
+DEFAULT_SAMPLE_SIZE = 16
+
+MERGE_TAG = 'tag:yaml.org,2002:merge'
+
+# Bump when the layout of the cache blob changes, old caches are then ignored
+CACHE_FORMAT_VERSION = 1
+
+
+def content_hash(content: bytes) -> str:
+    return hashlib.blake2b(content, digest_size=20).hexdigest()
+
+
+def cache_path_for(yaml_path: str) -> str:
+    """The parse cache lives next to the yaml file, e.g. `.settings.yaml.cache`."""
+    directory, filename = os.path.split(os.path.abspath(yaml_path))
+    return os.path.join(directory, f'.{filename}.cache')
+
+
+def parse_yaml(content, round_trip: bool = False) -> Any:
+    """Parse yaml content (str or bytes).
+
+    The safe loader uses the C based parser of `ruamel.yaml.clib` when it is installed
+    and returns plain dicts and lists. Round-trip mode keeps comments and ordering in
+    `CommentedMap`/`CommentedSeq` and should only be used where those matter.
+    """
+    # Imported here, so loading a cached or frozen snapshot never pays for importing ruamel.yaml
+    from ruamel.yaml import YAML
+
+    # YAML instances are not thread-safe, so they are not shared
+    yaml = YAML() if round_trip else YAML(typ='safe', pure=False)
+    return yaml.load(content)
+
+
+def _read_cache(cache_path: str, digest: str):
+    try:
+        with open(cache_path, 'rb') as cache_file:
+            version, cached_digest, data = pickle.load(cache_file)
+    except Exception:
+        # A missing, corrupt or foreign cache is only a cache miss
+        return False, None
+
+    if version != CACHE_FORMAT_VERSION or cached_digest != digest:
+        return False, None
+    return True, data
+
+
+def _write_cache(cache_path: str, digest: str, data: Any):
+    temporary_path = f'{cache_path}.{os.getpid()}.tmp'
+    try:
+        with open(temporary_path, 'wb') as cache_file:
+            pickle.dump((CACHE_FORMAT_VERSION, digest, data), cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+        # Atomic, so concurrent workers never read a partially written cache
+        os.replace(temporary_path, cache_path)
+    except (OSError, pickle.PicklingError) as error:
+        logger.debug(f'Could not write the yaml parse cache `{cache_path}`: {error}')
+        try:
+            os.remove(temporary_path)
+        except OSError:
+            pass
+
+
+def load_yaml(yaml_path: str, round_trip: bool = False, use_cache: bool = None) -> Any:
+    """Load a yaml file with the safe loader, reusing the on-disk parse cache when the
+    content hash of the file did not change.
+
+    `use_cache` defaults to the `SETTINGS_PARSE_CACHE` environment variable (enabled unless
+    it is `0`). Round-trip loads are never cached.
+    """
+    with open(yaml_path, 'rb') as file:
+        content = file.read()
+
+    if round_trip:
+        return parse_yaml(content, round_trip=True)
+
+    if use_cache is None:
+        use_cache = os.getenv('SETTINGS_PARSE_CACHE', '1') != '0'
+    if not use_cache:
+        return parse_yaml(content)
+
+    digest = content_hash(content)
+    cache_path = cache_path_for(yaml_path)
+    is_cached, data = _read_cache(cache_path, digest)
+    if is_cached:
+        return data
+
+    data = parse_yaml(content)
+    _write_cache(cache_path, digest, data)
+    return data
+
+
+def load_yaml_sample(yaml_path: str, sample_size: int = DEFAULT_SAMPLE_SIZE) -> Any:
+    """Stream the parser events of a yaml file and only materialize the first `sample_size`
+    items of every list, which is all that schema inference needs.
+
+    Peak memory stays flat with the size of large tables (e.g. calibration data), as the
+    skipped items are never constructed. Aliases to anchors inside skipped items resolve
+    to None.
+    """
+    from ruamel.yaml import YAML
+    from ruamel.yaml.events import (AliasEvent, CollectionStartEvent, MappingStartEvent, ScalarEvent,
+                                    SequenceStartEvent, CollectionEndEvent)
+    from ruamel.yaml.nodes import ScalarNode
+
+    yaml = YAML(typ='safe', pure=False)
+    resolver, constructor = yaml.resolver, yaml.constructor
+
+    root = None
+    anchors = {}
+    # Open collections as [container, anchor, pending mapping key]
+    stack = []
+    skip_depth = 0
+    no_key = object()
+
+    def add(value):
+        nonlocal root
+        if not stack:
+            root = value
+            return
+        frame = stack[-1]
+        container = frame[0]
+        if isinstance(container, list):
+            container.append(value)
+        elif frame[2] is no_key:
+            # Complex (collection) keys can not be dict keys, they are sampled as strings
+            frame[2] = value if isinstance(value, (str, int, float, bool, type(None))) else str(value)
+        else:
+            key, frame[2] = frame[2], no_key
+            if key == '<<' and isinstance(value, (dict, list)):
+                # Merge key: the merged mappings only fill in keys that are not set explicitly
+                for merged in value if isinstance(value, list) else [value]:
+                    for merged_key, merged_value in merged.items():
+                        container.setdefault(merged_key, merged_value)
+            else:
+                container[key] = value
+
+    with open(yaml_path, 'rb') as file:
+        for event in yaml.parse(file):
+            if skip_depth:
+                if isinstance(event, CollectionStartEvent):
+                    skip_depth += 1
+                elif isinstance(event, CollectionEndEvent):
+                    skip_depth -= 1
+                continue
+
+            if isinstance(event, CollectionEndEvent):
+                container, anchor, _ = stack.pop()
+                if anchor is not None:
+                    anchors[anchor] = container
+                add(container)
+                continue
+
+            if not isinstance(event, (ScalarEvent, AliasEvent, CollectionStartEvent)):
+                continue
+
+            # Items of a list beyond the sample are skipped without being constructed
+            if stack and isinstance(stack[-1][0], list) and len(stack[-1][0]) >= sample_size:
+                if isinstance(event, CollectionStartEvent):
+                    skip_depth = 1
+                continue
+
+            if isinstance(event, MappingStartEvent):
+                stack.append([{}, event.anchor, no_key])
+            elif isinstance(event, SequenceStartEvent):
+                stack.append([[], event.anchor, no_key])
+            elif isinstance(event, AliasEvent):
+                add(anchors.get(event.anchor))
+            else:
+                tag = event.tag or resolver.resolve(ScalarNode, event.value, event.implicit)
+                # Looked up directly, `construct_object` would keep every constructed node alive.
+                # Unknown tags and the `<<` merge key are sampled as their plain string.
+                node = ScalarNode(tag, event.value, style=event.style)
+                construct = constructor.yaml_constructors.get(node.tag)
+                value = event.value if construct is None or node.tag == MERGE_TAG else construct(constructor, node)
+                if event.anchor is not None:
+                    anchors[event.anchor] = value
+                add(value)
+
+    return root
@@ -1,6 +1,12 @@
 import logging
-from ruamel.yaml import YAML
-from typing import Dict, List, Any, Set
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Any, Optional, Set, Tuple
+
+from settingsgen.build_manifest import TYPES_CODE_VERSION
+from settingsgen.yaml_loader import content_hash, load_yaml, load_yaml_sample
+from settingsgen.schema_constraints import Constraints, check_constraints, compile_constraints
+from settingsgen.schema_inference import (Shape, NONE, infer_shape, is_class_shape, is_nullable, unify_all,
+                                          without_none)
 
 logger = logging.getLogger('rl_commons.settingsgen')
 
@@ -11,101 +17,482 @@ def convert_to_camel_case(snake_str: str) -> str:
     return ''.join(x.capitalize() for x in components)
 
 
-def infer_type(value: Any, key: str = None) -> str:
-    """Infers the type of a value for the dataclass."""
-    if isinstance(value, str):
-        return 'str'
-    elif isinstance(value, int):
-        return 'int'
-    elif isinstance(value, float):
-        return 'float'
-    elif isinstance(value, bool):
-        return 'bool'
-    elif isinstance(value, list):
-        if value and isinstance(value[0], dict):
-            return f'List[{convert_to_camel_case(key or "Item")}]'
-        elif value:
-            return f'List[{infer_type(value[0])}]'
-        else:
-            return 'List[Any]'
-    elif isinstance(value, dict):
-        if not value:  # Empty dict
-            return 'Optional[Any]'
-        else:
-            return convert_to_camel_case(key or 'NestedClass')
-    else:
+# Annotations of the scalar shapes
+SCALAR_TYPES = {'str': 'str', 'int': 'int', 'float': 'float', 'bool': 'bool', 'none': 'Optional[Any]',
+                'any': 'Any', 'empty': 'Any'}
+
+# Inlined `isinstance` checks used by the generated loaders, keyed by the scalar kind.
+# Kinds that are missing here (e.g. `any`) are not checked.
+SCALAR_CHECKS = {
+    'str': 'isinstance({value}, str)',
+    'int': 'isinstance({value}, int)',
+    'float': 'isinstance({value}, (int, float))',
+    'bool': 'isinstance({value}, bool)',
+    'none': '{value} is None',
+}
+
+# First line of the generated code: `<prefix><schema fingerprint> <content hash of the rest>`
+FINGERPRINT_PREFIX = '# Settings schema fingerprint: '
+
+# Names a field can not use as a local variable in the generated loaders
+LOADER_RESERVED_NAMES = {'data', 'prefix', 'error', 'item', 'position', 'instance', 'isinstance', 'int', 'float',
+                         'str', 'bool', 'list', 'dict', 'all', 'enumerate'}
+
+
+def infer_type(shape: Shape, class_name: str = None) -> str:
+    """The type annotation for a value of the given shape, `class_name` names its mappings."""
+    kind = shape[0]
+    if kind in SCALAR_TYPES:
+        return SCALAR_TYPES[kind]
+    if kind == 'list':
+        return f'List[{infer_type(shape[1], class_name)}]'
+    if kind == 'dict':
+        return (class_name or 'NestedClass') if shape[1] else 'Optional[Any]'
+
+    if any(member[0] == 'dict' and not member[1] for member in shape[1]):
         return 'Any'
+    rest = without_none(shape)
+    if rest[0] == 'union':
+        annotation = 'Union[' + ', '.join(infer_type(member, class_name) for member in rest[1]) + ']'
+    else:
+        annotation = infer_type(rest, class_name)
+    return f'Optional[{annotation}]' if is_nullable(shape) and not annotation.startswith('Optional[') else annotation
+
+
+def field_type(shape: Shape, required: bool, class_name: str = None) -> str:
+    """The annotation of a field, keys that are missing in some list items are `Optional`."""
+    annotation = infer_type(shape, class_name)
+    if not required and annotation != 'Any' and not annotation.startswith('Optional['):
+        annotation = f'Optional[{annotation}]'
+    return annotation
 
 
-def extract_dependencies(data: Dict[str, Any]) -> Set[str]:
-    """Extracts the list of nested class names required for this dictionary."""
-    dependencies = set()
-    for key, value in data.items():
-        if isinstance(value, (dict)):
-            dependencies.add(convert_to_camel_case(key))
-            dependencies.update(extract_dependencies(value))
-        elif isinstance(value, list) and value and isinstance(value[0], dict):
-            dependencies.add(convert_to_camel_case(key))
-            dependencies.update(extract_dependencies(value[0]))
-    return dependencies
+def nested_class_shape(shape: Shape) -> Optional[Shape]:
+    """The mapping shape a field turns into a dataclass, directly, as list item or union member."""
+    kind = shape[0]
+    if kind == 'dict':
+        return shape if shape[1] else None
+    if kind == 'list':
+        return nested_class_shape(shape[1])
+    if kind == 'union':
+        nested = [nested_class_shape(member) for member in shape[1]]
+        nested = [member for member in nested if member is not None]
+        return unify_all(nested) if nested else None
+    return None
 
 
-def generate_dataclass_code(class_name: str, data: Dict[str, Any]) -> str:
-    """Generate the Python dataclass code for the given class name and data."""
-    lines = [f'@dataclass']
+def unique_class_name(key: str, parent_class_name: str, taken: Set[str]) -> str:
+    """The class name for the mapping under `key`, qualified with the name of the parent
+    class (and numbered if still needed) when a different schema already uses that name.
+    """
+    class_name = convert_to_camel_case(key)
+    if class_name not in taken:
+        return class_name
+    class_name = parent_class_name + class_name
+    candidate = class_name
+    number = 2
+    while candidate in taken:
+        candidate = f'{class_name}{number}'
+        number += 1
+    return candidate
+
+
+def generate_dataclass_code(class_name: str, shape: Shape, field_classes: Dict[str, str],
+                            frozen_slots: bool = False, lazy: bool = False) -> str:
+    """Generate the Python dataclass code for the given class name and mapping shape.
+    With `lazy` the fields that hold nested classes are built on first access.
+    """
+    lines = ['@frozen_dataclass' if frozen_slots else '@dataclass']
     lines.append(f'class {class_name}:')
-    if not data:
+    if not shape[1]:
         lines.append('    pass')
         return '\n'.join(lines)
 
-    for key, value in data.items():
-        if isinstance(value, dict) and value:
-            nested_class_name = convert_to_camel_case(key)
-            lines.append(f'    {key}: {nested_class_name}')
-        elif isinstance(value, list) and value and isinstance(value[0], dict):
-            nested_class_name = convert_to_camel_case(key)
-            lines.append(f'    {key}: List[{nested_class_name}]')
-        else:
-            value_type = infer_type(value, key)
-            lines.append(f'    {key}: {value_type}')
+    for key, value_shape, required in shape[1]:
+        lines.append(f'    {key}: {field_type(value_shape, required, field_classes.get(key))}')
+
+    if lazy and field_classes:
+        lines.append('')
+        lines.append('    def __getattr__(self, name: str) -> Any:')
+        lines.append(f'        return _materialize(self, name, _convert_{class_name})')
+
+    return '\n'.join(lines)
+
+
+def _parenthesize(expression: str) -> str:
+    return f'({expression})' if ' and ' in expression or ' or ' in expression else expression
+
+
+def type_check_code(shape: Shape, value: str, depth: int = 0) -> Optional[str]:
+    """An inlined expression that is true when `value` matches the shape, None when anything
+    matches. Nested mappings are only checked to be a dict, their loader checks the rest.
+    """
+    kind = shape[0]
+    if kind in SCALAR_CHECKS:
+        return SCALAR_CHECKS[kind].format(value=value)
+    if kind == 'dict':
+        return f'isinstance({value}, dict)' if shape[1] else None
+    if kind == 'list':
+        item_shape = shape[1]
+        item = 'item' if not depth else f'item_{depth}'
+        item_check = None if is_class_shape(item_shape) else type_check_code(item_shape, item, depth + 1)
+        if item_check is None:
+            return f'isinstance({value}, list)'
+        return f'isinstance({value}, list) and all({item_check} for {item} in {value})'
+    if kind == 'union':
+        checks = [type_check_code(member, value, depth) for member in shape[1]]
+        if any(check is None for check in checks):
+            return None
+        return ' or '.join(_parenthesize(check) for check in checks)
+    return None
+
+
+def conversion_code(shape: Shape, value: str, path: str, class_name: str, depth: int = 0) -> Optional[str]:
+    """An expression that builds the dataclasses inside `value`, None if nothing to build.
+    `path` is the body of an f-string with the dotted path prefix of the value.
+    """
+    kind = shape[0]
+    if kind == 'dict':
+        return f"_load_{class_name}({value}, f'{path}')" if shape[1] else None
+    if kind == 'list':
+        item, position = ('item', 'position') if not depth else (f'item_{depth}', f'position_{depth}')
+        item_conversion = conversion_code(shape[1], item, f'{path}{{{position}}}.', class_name, depth + 1)
+        if item_conversion is None:
+            return None
+        return f'[{item_conversion} for {position}, {item} in enumerate({value})]'
+    if kind == 'union':
+        branches = []
+        for member in shape[1]:
+            conversion = conversion_code(member, value, path, class_name, depth)
+            if conversion is not None:
+                branches.append(f'{conversion} if isinstance({value}, {member[0]}) else ')
+        if not branches:
+            return None
+        return f"({''.join(branches)}{value})"
+    return None
+
+
+def generate_loader_code(class_name: str, shape: Shape, field_classes: Dict[str, str], lazy: bool = False,
+                         check_constraints: bool = False) -> str:
+    """Generate a straight-line `_load_<class_name>(data)` function that builds the dataclass
+    (and its nested dataclasses) from parsed YAML data with the type checks inlined.
+
+    With `lazy` the fields that hold nested classes are only checked to be a mapping or list
+    and kept as parsed, `_convert_<class_name>` builds them on first access.
+    With `check_constraints` the data is first checked by the generated `_check_constraints`.
+    """
+    lines = [f'def _load_{class_name}(data: Any, prefix: str = \'\') -> {class_name}:']
+    lines.append('    if not isinstance(data, dict):')
+    lines.append(f'        raise _wrong_type(prefix.rstrip(\'.\') or \'{class_name}\', \'a mapping\', data)')
+    if check_constraints:
+        lines.append('    _check_constraints(data)')
+
+    fields = [(key, f'{key}_' if key in LOADER_RESERVED_NAMES else key, value_shape, required)
+              for key, value_shape, required in shape[1]]
+    # Required, non-nullable keys must be present, the others default to None
+    required_fields = [(key, local) for key, local, value_shape, required in fields
+                       if required and not is_nullable(value_shape) and value_shape != ('dict', ())]
+    if required_fields:
+        lines.append('    try:')
+        lines.extend(f'        {local} = data[\'{key}\']' for key, local in required_fields)
+        lines.append('    except KeyError as error:')
+        lines.append('        raise _missing_key(prefix, error) from None')
+    lines.extend(f'    {local} = data.get(\'{key}\')' for key, local, _, _ in fields if (key, local) not in required_fields)
+
+    for key, local, value_shape, required in fields:
+        indent = '    '
+        if (key, local) not in required_fields:
+            if value_shape == NONE:
+                continue
+            value_shape = without_none(value_shape)
+        check = type_check_code(value_shape, local)
+        conversion = conversion_code(value_shape, local, f'{{prefix}}{key}.', field_classes.get(key))
+        if lazy and key in field_classes:
+            # Only the outer type is checked, the nested classes check the rest once built
+            check = shallow_check_code(value_shape, local)
+            conversion = None
+        if check is None and conversion is None:
+            continue
+
+        if (key, local) not in required_fields:
+            lines.append(f'    if {local} is not None:')
+            indent = '        '
+        if check is not None:
+            annotation = infer_type(value_shape, field_classes.get(key))
+            lines.append(f'{indent}if not {_parenthesize(check)}:')
+            lines.append(f'{indent}    raise _wrong_type(prefix + \'{key}\', \'{annotation}\', {local})')
+        if conversion is not None:
+            lines.append(f'{indent}{local} = {conversion}')
+
+    if lazy and field_classes:
+        # Built without `__init__`, the pending fields are not set until `_materialize`
+        values = ', '.join(f'{key}={local}' for key, local, _, _ in fields if key not in field_classes)
+        pending = ', '.join(f"'{key}': {local}" for key, local, _, _ in fields if key in field_classes)
+        lines.append(f'    instance = {class_name}.__new__({class_name})')
+        lines.append(f'    instance.__dict__.update({values + ", " if values else ""}_pending={{{pending}}}, _prefix=prefix)')
+        lines.append('    return instance')
+        return '\n'.join(lines)
+
+    arguments = ', '.join(f'{key}={local}' for key, local, _, _ in fields)
+    lines.append(f'    return {class_name}({arguments})')
+
+    return '\n'.join(lines)
+
+
+def shallow_check_code(shape: Shape, value: str) -> Optional[str]:
+    """Like `type_check_code`, but only checks the outer type of lists and mappings."""
+    kind = shape[0]
+    if kind == 'list' or is_class_shape(shape):
+        return f'isinstance({value}, {kind})'
+    if kind == 'union':
+        checks = [shallow_check_code(member, value) for member in shape[1]]
+        if any(check is None for check in checks):
+            return None
+        return ' or '.join(_parenthesize(check) for check in checks)
+    return type_check_code(shape, value)
+
 
+def generate_converter_code(class_name: str, shape: Shape, field_classes: Dict[str, str]) -> str:
+    """Generate `_convert_<class_name>(name, value, prefix)`, which builds a lazily loaded field
+    of the class from its parsed value.
+    """
+    lines = [f'def _convert_{class_name}(name: str, value: Any, prefix: str) -> Any:']
+    lines.append('    if value is None:')
+    lines.append('        return None')
+    for key, value_shape, _ in shape[1]:
+        if key not in field_classes:
+            continue
+        conversion = conversion_code(without_none(value_shape), 'value', f'{{prefix}}{key}.', field_classes[key])
+        lines.append(f'    if name == \'{key}\':')
+        lines.append(f'        return {conversion}')
+    lines.append('    return value')
     return '\n'.join(lines)
 
 
-def generate_dataclasses_from_yaml(data: Dict[str, Any], parent_class_name: str = 'RootSchema') -> str:
-    """Recursively generates dataclasses from a YAML-like dictionary."""
+LOADER_HELPERS = '''
+
+def _wrong_type(path: str, expected: str, value: Any) -> TypeError:
+    return TypeError(f'Settings value `{path}` should be {expected}, got {type(value).__name__}: {value!r}')
+
+
+def _missing_key(prefix: str, error: KeyError) -> ValueError:
+    return ValueError(f'Settings key `{prefix}{error.args[0]}` is missing')
+'''
+
+
+LAZY_HELPERS = '''
+
+def _materialize(instance: Any, name: str, convert) -> Any:
+    """Build a lazily loaded field on first access and keep it on the instance."""
+    pending = instance.__dict__.get('_pending')
+    if pending is None or name not in pending:
+        raise AttributeError(f'{type(instance).__name__!r} object has no attribute {name!r}')
+    # Not removed from `_pending`, which copies of the instance share
+    value = instance.__dict__[name] = convert(name, pending[name], instance.__dict__['_prefix'])
+    return value
+'''
+
+
+FROZEN_DATACLASS_HELPER = '''
+
+def frozen_dataclass(cls):
+    """`@dataclass(frozen=True, slots=True)`, with the slots added by hand on Python < 3.10."""
+    if sys.version_info >= (3, 10):
+        return dataclass(frozen=True, slots=True)(cls)
+
+    cls = dataclass(frozen=True)(cls)
+    field_names = tuple(field.name for field in fields(cls))
+    cls_dict = dict(cls.__dict__)
+    for name in field_names + ('__dict__', '__weakref__'):
+        cls_dict.pop(name, None)
+    cls_dict['__slots__'] = field_names
+
+    # Like `dataclass(slots=True)`, pickle and copy can not restore frozen slots with `setattr`
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in field_names)
+
+    def __setstate__(self, state):
+        for name, value in zip(field_names, state):
+            object.__setattr__(self, name, value)
+
+    cls_dict['__getstate__'], cls_dict['__setstate__'] = __getstate__, __setstate__
+    return type(cls)(cls.__name__, cls.__bases__, cls_dict)
+'''
+
+
+@dataclass
+class SchemaModel:
+    """Canonical model of generated settings types: the annotation of every field per class,
+    and a fingerprint of everything the generated code depends on (the shapes, the options,
+    the constraints and the generator version).
+    """
+    classes: Dict[str, Dict[str, str]]
+    fingerprint: Optional[str] = None
+
+    def diff(self, other: 'SchemaModel') -> List[str]:
+        """What changed per class from this model to `other`, one line per change."""
+        changes = []
+        for class_name in self.classes.keys() - other.classes.keys():
+            changes.append(f'Removed class `{class_name}`')
+        for class_name, fields in other.classes.items():
+            old_fields = self.classes.get(class_name)
+            if old_fields is None:
+                changes.append(f'Added class `{class_name}`')
+                continue
+            for name in old_fields.keys() - fields.keys():
+                changes.append(f'Removed `{class_name}.{name}`')
+            for name, annotation in fields.items():
+                if name not in old_fields:
+                    changes.append(f'Added `{class_name}.{name}: {annotation}`')
+                elif old_fields[name] != annotation:
+                    changes.append(f'Changed `{class_name}.{name}` from `{old_fields[name]}` to `{annotation}`')
+        return sorted(changes)
+
+
+def fingerprint_header(fingerprint: str, body: str) -> str:
+    """The first line of a generated file, with the content hash of the rest of the file to
+    notice when it was edited by hand.
+    """
+    return f'{FINGERPRINT_PREFIX}{fingerprint} {content_hash(body.encode())}\n'
+
+
+def read_fingerprint(content: str) -> Optional[str]:
+    """The schema fingerprint in the header of generated code, None when there is none or
+    the code was edited after it was generated.
+    """
+    if not content.startswith(FINGERPRINT_PREFIX):
+        return None
+    header, _, body = content.partition('\n')
+    fields = header[len(FINGERPRINT_PREFIX):].split()
+    if len(fields) != 2 or fields[1] != content_hash(body.encode()):
+        return None
+    return fields[0]
+
+
+def build_dataclass_code(data: Dict[str, Any], parent_class_name: str = 'RootSchema',
+                         frozen_slots: bool = False, lazy: bool = False,
+                         constraints: Optional[Constraints] = None) -> Tuple[SchemaModel, Iterator[str]]:
+    """Infer the settings types of a YAML-like dictionary. Returns their `SchemaModel` and an
+    iterator over the chunks of the generated module (without the fingerprint header).
+
+    With `frozen_slots` the classes are emitted as frozen dataclasses with `__slots__`,
+    which use less memory and can be shared between threads without copying.
+
+    With `lazy` the nested classes are only built when their field is first accessed, the
+    untouched sections stay as parsed. Lazy fields live in the instance `__dict__`, so they
+    can not be combined with `frozen_slots`.
+
+    With `constraints` (see `schema_constraints`) the root loader checks them once per load.
+    Raises a ValueError for constraints that do not fit the inferred schema.
+    """
+    if lazy and frozen_slots:
+        raise ValueError('Lazy settings types can not be generated with `frozen_slots`')
+
     all_classes = {}
+    all_loaders = {}
+    all_converters = {}
     class_dependencies = {}
-    
-    def recursive_generate_classes(class_name: str, sub_data: Dict[str, Any]):
+    # What the generated code of each class depends on, for the fingerprint
+    class_sources = {}
+
+    root_shape = infer_shape(data)
+    if not is_class_shape(root_shape):
+        root_shape = ('dict', ())
+    if constraints:
+        check_constraints(constraints, root_shape)
+
+    # The shapes are the structural fingerprints of the classes: identical sub-schemas share
+    # one class, different ones that would get the same name get a path-qualified name
+    class_names = {root_shape: parent_class_name}
+
+    def class_name_for(key: str, shape: Shape, parent: str) -> str:
+        if shape not in class_names:
+            class_names[shape] = unique_class_name(key, parent, set(class_names.values()))
+        return class_names[shape]
+
+    def recursive_generate_classes(class_name: str, shape: Shape):
         """Recursively generate the classes for all substructures."""
-        nonlocal all_classes
         if class_name in all_classes:
             return  # Class already generated
-        
-        class_code = generate_dataclass_code(class_name, sub_data)
-        all_classes[class_name] = class_code
-        
-        dependencies = extract_dependencies(sub_data)
-        class_dependencies[class_name] = dependencies
-        
-        for key, value in sub_data.items():
-            if isinstance(value, (dict)):
-                nested_class_name = convert_to_camel_case(key)
-                recursive_generate_classes(nested_class_name, value)
-            elif isinstance(value, list) and value and isinstance(value[0], dict):
-                nested_class_name = convert_to_camel_case(key)
-                recursive_generate_classes(nested_class_name, value[0])
-    
-    recursive_generate_classes(parent_class_name, data)
-    
+
+        nested_shapes = {}
+        for key, value_shape, _ in shape[1]:
+            nested_shape = nested_class_shape(value_shape)
+            if nested_shape is not None:
+                nested_shapes[key] = nested_shape
+        field_classes = {key: class_name_for(key, nested_shape, class_name)
+                         for key, nested_shape in nested_shapes.items()}
+
+        all_classes[class_name] = generate_dataclass_code(class_name, shape, field_classes, frozen_slots=frozen_slots,
+                                                          lazy=lazy)
+        class_sources[class_name] = (shape, tuple(field_classes.items()))
+        all_loaders[class_name] = generate_loader_code(class_name, shape, field_classes, lazy=lazy,
+                                                       check_constraints=bool(constraints) and class_name == parent_class_name)
+        if lazy and field_classes:
+            all_converters[class_name] = generate_converter_code(class_name, shape, field_classes)
+        class_dependencies[class_name] = set(field_classes.values())
+
+        for key, nested_shape in nested_shapes.items():
+            recursive_generate_classes(field_classes[key], nested_shape)
+
+    recursive_generate_classes(parent_class_name, root_shape)
+
     # Topological sort of classes to ensure dependencies are met
-    sorted_classes = topological_sort(class_dependencies)
-    
-    comments = '"""\nThe dataclasses are automatically generated from the given yaml schema\n"""\n'
-    imports = 'from dataclasses import dataclass\nfrom typing import List, Optional, Any\n\n'
-    
-    return comments + imports + '\n\n'.join(all_classes[class_name] for class_name in sorted_classes if class_name in all_classes)
+    sorted_classes = [class_name for class_name in topological_sort(class_dependencies) if class_name in all_classes]
+
+    canonical_constraints = sorted((path, sorted(path_constraints.items())) for path, path_constraints
+                                   in (constraints or {}).items())
+    fingerprint = content_hash(repr((
+        TYPES_CODE_VERSION, parent_class_name, frozen_slots, lazy, canonical_constraints,
+        [(class_name, class_sources[class_name]) for class_name in sorted_classes],
+    )).encode())
+    model = SchemaModel({
+        class_name: {key: field_type(value_shape, required, dict(class_sources[class_name][1]).get(key))
+                     for key, value_shape, required in class_sources[class_name][0][1]}
+        for class_name in sorted_classes
+    }, fingerprint)
+    return model, _iter_module_code(sorted_classes, all_classes, all_loaders, all_converters, frozen_slots,
+                                    constraints)
+
+
+def _iter_module_code(sorted_classes: List[str], all_classes: Dict[str, str], all_loaders: Dict[str, str],
+                      all_converters: Dict[str, str], frozen_slots: bool,
+                      constraints: Optional[Constraints]) -> Iterator[str]:
+    yield '"""\nThe dataclasses are automatically generated from the given yaml schema, together with\n' \
+          'a `_load_<ClassName>(data)` function per class that builds it from the parsed yaml\n"""\n'
+    constraints_import = '\nfrom settingsgen.schema_constraints import SettingsValidationError\n' if constraints else ''
+    if frozen_slots:
+        yield 'import sys\n\nfrom dataclasses import dataclass, fields\nfrom typing import List, Optional, Any, Union\n'
+        yield constraints_import + FROZEN_DATACLASS_HELPER + '\n\n'
+    else:
+        yield 'from dataclasses import dataclass\nfrom typing import List, Optional, Any, Union\n'
+        yield constraints_import + '\n'
+
+    for position, class_name in enumerate(sorted_classes):
+        yield ('\n\n' if position else '') + all_classes[class_name]
+
+    yield '\n' + LOADER_HELPERS + (LAZY_HELPERS if all_converters else '') + '\n\n'
+    if constraints:
+        yield compile_constraints(constraints) + '\n\n\n'
+
+    for position, class_name in enumerate(sorted_classes):
+        yield ('\n\n\n' if position else '') + all_loaders[class_name]
+    for class_name in sorted_classes:
+        if class_name in all_converters:
+            yield '\n\n\n' + all_converters[class_name]
+    yield '\n'
+
+
+def generate_dataclasses_from_yaml(data: Dict[str, Any], parent_class_name: str = 'RootSchema',
+                                   frozen_slots: bool = False, lazy: bool = False,
+                                   constraints: Optional[Constraints] = None) -> Tuple[str, SchemaModel]:
+    """Recursively generates dataclasses from a YAML-like dictionary. Returns the code, which
+    starts with the fingerprint header, and the `SchemaModel` of the generated types.
+    """
+    model, chunks = build_dataclass_code(data, parent_class_name, frozen_slots=frozen_slots, lazy=lazy,
+                                         constraints=constraints)
+    body = ''.join(chunks)
+    return fingerprint_header(model.fingerprint, body) + body, model
 
 
 def topological_sort(dependencies: Dict[str, Set[str]]) -> List[str]:
@@ -136,18 +523,25 @@ def convert_commented_map_to_dict(data):
         return data
 
 
-def generate_dataclass_file(yaml_path: str, output_path: str = 'generated_dataclasses.py'):
-    """Main function to generate the dataclasses file from a YAML file."""
-    yaml = YAML()
-    with open(yaml_path, 'r') as file:
-        parsed_yaml = yaml.load(file)
-    
-    # Convert CommentedMap to a regular Python dict
-    parsed_yaml = convert_commented_map_to_dict(parsed_yaml)
+def generate_dataclass_file(yaml_path: str, output_path: str = 'generated_dataclasses.py', frozen_slots: bool = False,
+                            sample_size: int = None, lazy: bool = False,
+                            constraints: Optional[Constraints] = None) -> Tuple[str, SchemaModel]:
+    """Main function to generate the dataclasses file from a YAML file, returns the code and
+    the `SchemaModel` of the generated types.
+
+    With `sample_size` the YAML is streamed and only the first `sample_size` items of every
+    list are loaded for the schema inference.
+    """
+    # The safe loader already returns plain dicts and lists, no `CommentedMap` conversion needed
+    if sample_size:
+        parsed_yaml = load_yaml_sample(yaml_path, sample_size=sample_size)
+    else:
+        parsed_yaml = load_yaml(yaml_path)
     
     # Generate the dataclass code
-    dataclass_code = generate_dataclasses_from_yaml(parsed_yaml)
+    dataclass_code, model = generate_dataclasses_from_yaml(parsed_yaml, frozen_slots=frozen_slots, lazy=lazy,
+                                                           constraints=constraints)
 
     logger.debug(f"Dataclass file generated at: {output_path}")
 
-    return dataclass_code
\ No newline at end of file
+    return dataclass_code, model
\ No newline at end of file
@@ -0,0 +1,46 @@
+import sys
+import types
+import importlib
+import itertools
+
+import pytest
+
+from settingsgen.generate_settings import generate_app_settings
+
+_project_numbers = itertools.count()
+
+
+@pytest.fixture
+def make_project(tmp_path):
+    """Write a `settings.yaml` (and optionally a `settings.schema.yaml`), generate the settings
+    with the `options` of `generate_app_settings` and import the generated modules.
+
+    Returns the generated `application_settings` module, `settings_types` is its `types`
+    attribute.
+    """
+    package_names = []
+
+    def make(settings_yaml: str, schema_yaml: str = None, **options):
+        project_dir = tmp_path / f'project{next(_project_numbers)}'
+        project_dir.mkdir()
+        (project_dir / 'settings.yaml').write_text(settings_yaml)
+        if schema_yaml is not None:
+            (project_dir / 'settings.schema.yaml').write_text(schema_yaml)
+        generate_app_settings(str(project_dir), **options)
+
+        # The generated modules import each other relatively, every project gets its own package
+        package_name = f'_generated_{project_dir.name}'
+        package = types.ModuleType(package_name)
+        package.__path__ = [str(project_dir / 'settings')]
+        sys.modules[package_name] = package
+        package_names.append(package_name)
+        module = importlib.import_module(f'{package_name}.application_settings')
+        module.types = importlib.import_module(f'{package_name}.settings_types')
+        module.project_dir = project_dir
+        return module
+
+    yield make
+
+    for name in list(sys.modules):
+        if name.split('.')[0] in package_names:
+            del sys.modules[name]
@@ -0,0 +1,49 @@
+import asyncio
+
+from settingsgen.async_settings import AsyncSettings
+
+SETTINGS_YAML = """\
+mode: development
+robot:
+  arm:
+    speed: 1.5
+"""
+
+
+def test_watch_yields_changes_and_survives_an_invalid_file(make_project):
+    settings = make_project(SETTINGS_YAML)
+    settings_yaml = settings.project_dir / 'settings.yaml'
+    async_settings = AsyncSettings(settings.Configurator(str(settings.project_dir)))
+
+    async def edit():
+        await asyncio.sleep(0.2)
+        settings_yaml.write_text('mode: [development\n')
+        await asyncio.sleep(0.3)
+        assert async_settings.robot.arm.speed == 1.5
+        settings_yaml.write_text(SETTINGS_YAML.replace('1.5', '2.5'))
+
+    async def first_change():
+        editor = asyncio.ensure_future(edit())
+        async for change in async_settings.watch(debounce=0.02, poll_interval=0.02, use_inotify=False):
+            await editor
+            return change
+
+    change = asyncio.run(asyncio.wait_for(first_change(), timeout=10))
+
+    assert change.changed_paths == ['robot', 'robot.arm', 'robot.arm.speed']
+    assert async_settings.robot.arm.speed == 2.5
+
+
+def test_load_and_reload_run_in_the_executor(make_project):
+    settings = make_project(SETTINGS_YAML)
+    async_settings = AsyncSettings(settings.Configurator(str(settings.project_dir)))
+
+    async def load():
+        snapshot = await async_settings.load()
+        return snapshot, await async_settings.load(), await async_settings.reload()
+
+    first, cached, reloaded = asyncio.run(load())
+
+    assert first is cached
+    assert reloaded is not first and reloaded == first
+    assert async_settings['robot.arm.speed'] == 1.5
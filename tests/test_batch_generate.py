@@ -0,0 +1,54 @@
+import os
+import multiprocessing
+
+import pytest
+
+import settingsgen.generate_settings
+from settingsgen.batch_generate import CHANGED, FAILED, find_projects, generate_many
+
+generate_app_settings = settingsgen.generate_settings.generate_app_settings
+
+
+def crashing_generate_app_settings(directory, **options):
+    if os.path.basename(directory) == 'crashing':
+        os._exit(1)
+    if os.path.basename(directory) == 'broken':
+        raise ValueError('broken settings')
+    return generate_app_settings(directory, **options)
+
+
+@pytest.fixture
+def projects(tmp_path):
+    for name in ('first', 'crashing', 'broken', 'last'):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / 'settings.yaml').write_text(f'mode: development\nname: {name}\n')
+    return tmp_path
+
+
+def test_find_projects_expands_patterns_and_keeps_explicit_paths(projects):
+    (projects / 'no_settings').mkdir()
+
+    found = find_projects([str(projects / '*'), str(projects / 'missing')])
+
+    assert [os.path.basename(directory) for directory in found] == ['broken', 'crashing', 'first', 'last', 'missing']
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != 'fork',
+                    reason='the workers only see the patched generator when they are forked')
+def test_a_crashing_worker_only_fails_its_project(projects, monkeypatch):
+    monkeypatch.setattr(settingsgen.generate_settings, 'generate_app_settings', crashing_generate_app_settings)
+    directories = [str(projects / name) for name in ('first', 'crashing', 'broken', 'last')]
+
+    results = generate_many(directories, max_workers=2)
+
+    assert [result.directory for result in results] == directories
+    assert [result.status for result in results] == [CHANGED, FAILED, FAILED, CHANGED]
+    assert 'crashed' in results[1].error
+    assert 'broken settings' in results[2].error
+
+
+def test_a_missing_project_is_reported_as_failed(projects):
+    results = generate_many([str(projects / 'first'), str(projects / 'missing')], max_workers=1)
+
+    assert [result.status for result in results] == [CHANGED, FAILED]
+    assert 'No such project directory' in results[1].error
@@ -0,0 +1,47 @@
+from settingsgen.yaml_to_dataclass import build_dataclass_code, unique_class_name
+
+
+def generated_classes(data):
+    model, chunks = build_dataclass_code(data)
+    return model.classes, ''.join(chunks)
+
+
+def test_identical_sections_share_a_class():
+    classes, code = generated_classes({
+        'left_arm': {'speed': 1.5, 'joints': 6},
+        'right_arm': {'speed': 2.0, 'joints': 7},
+    })
+
+    assert classes['RootSchema'] == {'left_arm': 'LeftArm', 'right_arm': 'LeftArm'}
+    assert 'RightArm' not in classes
+    assert code.count('class LeftArm') == 1
+
+
+def test_colliding_names_are_qualified_with_the_parent():
+    classes, _ = generated_classes({
+        'robot': {'arm': {'speed': 1.5}},
+        'gripper': {'arm': {'width': 0.1}},
+    })
+
+    assert classes['Robot'] == {'arm': 'Arm'}
+    assert classes['Gripper'] == {'arm': 'GripperArm'}
+    assert classes['GripperArm'] == {'width': 'float'}
+
+
+def test_unique_class_name_numbers_the_remaining_collisions():
+    assert unique_class_name('arm', 'Robot', set()) == 'Arm'
+    assert unique_class_name('arm', 'Robot', {'Arm'}) == 'RobotArm'
+    assert unique_class_name('arm', 'Robot', {'Arm', 'RobotArm', 'RobotArm2'}) == 'RobotArm3'
+
+
+def test_shared_and_qualified_classes_load(make_project):
+    settings_types = make_project(
+        'arm:\n  speed: 1.5\nspare_arm:\n  speed: 2.0\n'
+        'robot:\n  arm:\n    joints: 6\n'
+    ).types
+
+    settings = settings_types._load_RootSchema({'arm': {'speed': 1.5}, 'spare_arm': {'speed': 2.0},
+                                                'robot': {'arm': {'joints': 6}}})
+
+    assert type(settings.arm) is type(settings.spare_arm) is settings_types.Arm
+    assert type(settings.robot.arm).__name__ == 'RobotArm'
@@ -0,0 +1,80 @@
+import os
+import time
+import threading
+
+SETTINGS_YAML = """\
+mode: development
+robot:
+  arm:
+    speed: 1.5
+"""
+
+
+def counting_configurator(settings, delay=0.0):
+    class CountingConfigurator(settings.Configurator):
+        parses = 0
+
+        def _parse(self):
+            CountingConfigurator.parses += 1
+            time.sleep(delay)
+            return super()._parse()
+
+    return CountingConfigurator(str(settings.project_dir))
+
+
+def touch(path, text):
+    path.write_text(text)
+    # Make sure the stat changes on file systems with a coarse mtime
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_the_snapshot_is_cached_until_the_file_changes(make_project):
+    settings = make_project(SETTINGS_YAML)
+    configurator = counting_configurator(settings)
+
+    snapshot = configurator.general_settings
+    assert configurator.general_settings is snapshot
+    assert type(configurator).parses == 1
+
+    touch(settings.project_dir / 'settings.yaml', SETTINGS_YAML.replace('1.5', '2.5'))
+    assert configurator.general_settings.robot.arm.speed == 2.5
+    assert type(configurator).parses == 2
+
+    # `reload` always parses again
+    assert configurator.reload() is configurator.snapshot
+    assert type(configurator).parses == 3
+
+
+def test_unchecked_settings_ignore_file_changes(make_project):
+    settings = make_project(SETTINGS_YAML)
+    configurator = settings.Configurator(str(settings.project_dir), check_for_changes=False)
+    snapshot = configurator.general_settings
+
+    touch(settings.project_dir / 'settings.yaml', SETTINGS_YAML.replace('1.5', '2.5'))
+
+    assert configurator.general_settings is snapshot
+    assert configurator.reload().robot.arm.speed == 2.5
+
+
+def test_threads_seeing_the_same_stale_snapshot_parse_once(make_project):
+    settings = make_project(SETTINGS_YAML)
+    configurator = counting_configurator(settings, delay=0.05)
+    configurator.general_settings
+    touch(settings.project_dir / 'settings.yaml', SETTINGS_YAML.replace('1.5', '2.5'))
+
+    barrier = threading.Barrier(8)
+    speeds = []
+
+    def read():
+        barrier.wait()
+        speeds.append(configurator.general_settings.robot.arm.speed)
+
+    threads = [threading.Thread(target=read) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert speeds == [2.5] * 8
+    assert type(configurator).parses == 2
@@ -0,0 +1,49 @@
+import sys
+import copy
+import pickle
+import dataclasses
+
+import pytest
+
+from settingsgen.generate_settings import load_settings_types
+
+SETTINGS_YAML = """\
+mode: development
+robot:
+  arm:
+    speed: 1.5
+  waypoints:
+    - x: 1
+"""
+
+DATA = {'mode': 'development', 'robot': {'arm': {'speed': 1.5}, 'waypoints': [{'x': 1}]}}
+
+
+@pytest.fixture(params=['native', 'fallback'])
+def settings_types(request, make_project, monkeypatch):
+    settings = make_project(SETTINGS_YAML, frozen_slots=True)
+    if request.param == 'native' and sys.version_info < (3, 10):
+        pytest.skip('`dataclass(slots=True)` needs Python 3.10')
+    if request.param == 'fallback':
+        # The slots are added by hand before Python 3.10
+        monkeypatch.setattr(sys, 'version_info', (3, 9, 0))
+    # Importable by its name, so its classes can be pickled
+    settings_types = load_settings_types(str(settings.project_dir / 'settings' / 'settings_types.py'))
+    monkeypatch.setitem(sys.modules, settings_types.__name__, settings_types)
+    return settings_types
+
+
+def test_frozen_slots_settings_are_frozen_and_slotted(settings_types):
+    settings = settings_types._load_RootSchema(DATA)
+
+    assert not hasattr(settings.robot.arm, '__dict__')
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        settings.robot.arm.speed = 2.0
+
+
+def test_frozen_slots_settings_can_be_pickled_and_copied(settings_types):
+    settings = settings_types._load_RootSchema(DATA)
+
+    assert pickle.loads(pickle.dumps(settings)) == settings
+    assert copy.deepcopy(settings) == settings
+    assert copy.copy(settings.robot.arm).speed == 1.5
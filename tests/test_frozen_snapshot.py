@@ -0,0 +1,57 @@
+import datetime
+
+import pytest
+
+from settingsgen.frozen_snapshot import load_snapshot, read_snapshot, write_snapshot
+
+DATED_YAML = """\
+mode: development
+release: 2024-01-01
+robot:
+  name: ur5
+"""
+
+
+def snapshot_file(settings):
+    return str(settings.project_dir / 'settings' / 'settings_snapshot.bin')
+
+
+def test_freeze_handles_dates(make_project):
+    settings = make_project(DATED_YAML, freeze=True)
+
+    _, data = read_snapshot(snapshot_file(settings))
+
+    assert data['release'] == datetime.date(2024, 1, 1)
+    assert settings.__settings__.general_settings.release == datetime.date(2024, 1, 1)
+
+
+def test_frozen_settings_load_without_the_yaml(make_project):
+    settings = make_project(DATED_YAML, freeze=True)
+    (settings.project_dir / 'settings.yaml').unlink()
+
+    configurator = settings.Configurator(str(settings.project_dir), snapshot_file=snapshot_file(settings))
+
+    assert configurator.reload().robot.name == 'ur5'
+    assert configurator['robot.name'] == 'ur5'
+
+
+def test_a_stale_snapshot_is_rebuilt_or_rejected(tmp_path):
+    yaml_path, snapshot_path = tmp_path / 'settings.yaml', str(tmp_path / 'settings_snapshot.bin')
+    yaml_path.write_text('mode: development\n')
+    assert write_snapshot(str(yaml_path), snapshot_path) == ({'mode': 'development'}, True)
+
+    yaml_path.write_text('mode: production\n')
+    with pytest.raises(ValueError, match='stale'):
+        load_snapshot(str(yaml_path), snapshot_path, on_stale='reject')
+    assert load_snapshot(str(yaml_path), snapshot_path) == {'mode': 'production'}
+    assert read_snapshot(snapshot_path)[1] == {'mode': 'production'}
+
+
+def test_an_unwritable_snapshot_is_reported(tmp_path):
+    yaml_path = tmp_path / 'settings.yaml'
+    yaml_path.write_text('mode: development\n')
+
+    data, is_written = write_snapshot(str(yaml_path), str(tmp_path / 'missing' / 'settings_snapshot.bin'))
+
+    assert data == {'mode': 'development'}
+    assert not is_written
@@ -0,0 +1,60 @@
+import os
+import sys
+
+import pytest
+
+from settingsgen import generate_settings
+from settingsgen.generate_settings import generate_app_settings
+
+SETTINGS_YAML = """\
+mode: development
+robot:
+  arm:
+    speed: 1.5
+"""
+
+
+def generated_stats(project_dir):
+    settings_dir = project_dir / 'settings'
+    return {name: os.stat(settings_dir / name).st_mtime_ns
+            for name in ('settings_types.py', 'application_settings.py')}
+
+
+def test_a_missing_project_directory_is_not_created(tmp_path):
+    with pytest.raises(FileNotFoundError, match='No such project directory'):
+        generate_app_settings(str(tmp_path / 'typo'))
+
+    assert not (tmp_path / 'typo').exists()
+
+
+def test_the_cli_fails_for_a_missing_project_directory(tmp_path, monkeypatch):
+    monkeypatch.setattr(sys, 'argv', ['generate-settings', str(tmp_path / 'typo')])
+
+    with pytest.raises(SystemExit) as error:
+        generate_settings.main()
+
+    assert error.value.code == 2
+    assert not (tmp_path / 'typo').exists()
+
+
+def test_an_unchanged_project_is_skipped(tmp_path):
+    (tmp_path / 'settings.yaml').write_text(SETTINGS_YAML)
+    assert generate_app_settings(str(tmp_path)) is True
+    stats = generated_stats(tmp_path)
+
+    assert generate_app_settings(str(tmp_path)) is False
+    assert generated_stats(tmp_path) == stats
+
+    assert generate_app_settings(str(tmp_path), force=True) is True
+
+
+def test_changed_options_and_edited_outputs_regenerate(tmp_path):
+    (tmp_path / 'settings.yaml').write_text(SETTINGS_YAML)
+    generate_app_settings(str(tmp_path))
+
+    assert generate_app_settings(str(tmp_path), instrument=True) is True
+    assert 'InstrumentedAppSettings' in (tmp_path / 'settings' / 'application_settings.py').read_text()
+
+    (tmp_path / 'settings' / 'application_settings.py').write_text('# edited by hand\n')
+    assert generate_app_settings(str(tmp_path), instrument=True) is True
+    assert 'InstrumentedAppSettings' in (tmp_path / 'settings' / 'application_settings.py').read_text()
@@ -0,0 +1,75 @@
+import pytest
+
+from settingsgen.schema_constraints import SettingsValidationError
+
+SETTINGS_YAML = """\
+mode: development
+robot:
+  name: ur5
+  arm:
+    speed: 1.5
+    joints: 6
+  waypoints:
+    - x: 1
+      y: 2
+    - x: 3
+      y: 4.5
+"""
+
+SCHEMA_YAML = """\
+mode:
+  enum: [development, production]
+robot.arm.speed:
+  min: 0
+  max: 2.5
+robot.waypoints.*.x:
+  min: 0
+"""
+
+
+def settings_data(**robot):
+    return {
+        'mode': 'development',
+        'robot': {'name': 'ur5', 'arm': {'speed': 1.5, 'joints': 6},
+                  'waypoints': [{'x': 1, 'y': 2}, {'x': 3, 'y': 4.5}], **robot},
+    }
+
+
+def test_load_builds_the_nested_dataclasses(make_project):
+    settings_types = make_project(SETTINGS_YAML).types
+
+    settings = settings_types._load_RootSchema(settings_data())
+
+    assert isinstance(settings.robot.arm, settings_types.Arm)
+    assert settings.robot.arm.speed == 1.5
+    # `int` and `float` items widen to `float`, ints are accepted
+    assert [waypoint.y for waypoint in settings.robot.waypoints] == [2, 4.5]
+
+
+def test_load_reports_the_path_of_a_wrong_type(make_project):
+    settings_types = make_project(SETTINGS_YAML).types
+
+    with pytest.raises(TypeError, match='robot.arm.joints'):
+        settings_types._load_RootSchema(settings_data(arm={'speed': 1.5, 'joints': 'six'}))
+
+
+def test_load_reports_a_missing_key(make_project):
+    settings_types = make_project(SETTINGS_YAML).types
+
+    with pytest.raises(ValueError, match='robot.arm.joints'):
+        settings_types._load_RootSchema(settings_data(arm={'speed': 1.5}))
+
+
+def test_check_constraints_raises_all_violations(make_project):
+    settings_types = make_project(SETTINGS_YAML, SCHEMA_YAML).types
+    data = settings_data(arm={'speed': 3, 'joints': 6}, waypoints=[{'x': 1, 'y': 2}, {'x': -1, 'y': 2}])
+    data['mode'] = 'staging'
+
+    with pytest.raises(SettingsValidationError) as error:
+        settings_types._load_RootSchema(data)
+
+    assert sorted(error.value.errors) == [
+        "`mode` should be one of ['development', 'production'], got 'staging'",
+        '`robot.arm.speed` should be <= 2.5, got 3',
+        '`robot.waypoints.1.x` should be >= 0, got -1',
+    ]
@@ -0,0 +1,140 @@
+import json
+import logging
+import dataclasses
+
+from concurrent.futures import ThreadPoolExecutor
+
+from types import SimpleNamespace
+
+import pytest
+
+from settingsgen.logger_configs import (RED, AppLogger, CustomLogFormatter, JsonLogFormatter, RateLimitFilter,
+                                        SamplingFilter, SuppressingFilter,
+                                        package_options)
+
+
+@pytest.fixture
+def root_logger():
+    root_logger = logging.getLogger()
+    handlers, level = list(root_logger.handlers), root_logger.level
+    yield root_logger
+    if AppLogger._active is not None:
+        AppLogger._active.remove_root_handler()
+        AppLogger._active = None
+    root_logger.handlers[:] = handlers
+    root_logger.setLevel(level)
+
+
+def settings(mode='development', **logging_options):
+    return SimpleNamespace(mode=mode, general_settings=SimpleNamespace(logging=logging_options))
+
+
+def test_app_logger_keeps_the_handlers_of_the_application(root_logger, tmp_path):
+    file_handler = logging.FileHandler(tmp_path / 'app.log')
+    root_logger.addHandler(file_handler)
+
+    first = AppLogger(settings())
+    second = AppLogger(settings(mode='production', asynchronous=True))
+
+    assert file_handler in root_logger.handlers
+    assert file_handler.stream is not None and not file_handler.stream.closed
+    assert first.console_handler not in root_logger.handlers
+    assert second.queue_handler in root_logger.handlers
+    assert root_logger.level == AppLogger.LOG_LEVEL_PROD
+    file_handler.close()
+
+
+def test_app_logger_flushes_the_queue_of_the_replaced_logger(root_logger):
+    first = AppLogger(settings(asynchronous=True))
+    listener = first.queue_listener
+
+    AppLogger(settings())
+
+    assert first.queue_listener is None
+    assert listener._thread is None
+    assert first.queue_handler not in root_logger.handlers
+
+
+def log_record(name='app', level=logging.DEBUG, lineno=1):
+    return logging.LogRecord(name, level, __file__, lineno, 'message', None, None)
+
+
+def log_record(level=logging.INFO, message='Settings exported', **attributes):
+    record = logging.LogRecord('rl_commons.settingsgen', level, __file__, 7, message, None, None)
+    record.__dict__.update(attributes)
+    return record
+
+
+def test_custom_formatter_uses_the_format_of_the_level():
+    formatter = CustomLogFormatter()
+
+    assert RED in formatter.format(log_record(logging.ERROR))
+    assert RED not in formatter.format(log_record(logging.INFO))
+    assert ' : Level 25 | ' in formatter.format(log_record(25))
+
+
+def test_custom_formatter_is_thread_safe():
+    formatter = CustomLogFormatter()
+    records = [log_record(level, f'message {number}') for number, level
+               in enumerate([logging.ERROR, logging.INFO, 25] * 200)]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        formatted = list(executor.map(formatter.format, records))
+
+    for record, text in zip(records, formatted):
+        assert (RED in text) == (record.levelno == logging.ERROR)
+        assert (' | ' in text) == (record.levelno == 25)
+
+
+def test_json_formatter_caches_the_timestamp_per_second():
+    cached, uncached = JsonLogFormatter(), JsonLogFormatter(cache_asctime=False)
+    records = [log_record(created=1700000000.25, msecs=250.0), log_record(created=1700000000.75, msecs=750.0),
+               log_record(created=1700000001.5, msecs=500.0)]
+
+    lines = [json.loads(cached.format(record)) for record in records]
+
+    assert [line['time'] for line in lines] == [json.loads(uncached.format(record))['time'] for record in records]
+    assert lines[0]['time'].endswith('.250') and lines[1]['time'].endswith('.750')
+    assert lines[0] == {'time': lines[0]['time'], 'level': 'INFO', 'logger': 'rl_commons.settingsgen',
+                        'message': 'Settings exported', 'file': 'test_logger_configs.py', 'line': 7}
+
+
+def test_suppressing_filters_implement_should_log():
+    with pytest.raises(TypeError):
+        SuppressingFilter()
+
+
+def test_rate_limit_passes_the_burst_then_suppresses():
+    record_filter = RateLimitFilter(rate=0.001, burst=3, report_interval=3600)
+
+    passed = [record_filter.filter(log_record()) for _ in range(5)]
+
+    assert passed == [True, True, True, False, False]
+    assert record_filter.filter(log_record(name='other'))
+    assert record_filter.suppressed_total == 2
+
+
+def test_sampling_always_keeps_warnings():
+    record_filter = SamplingFilter(probability=0.0, report_interval=3600)
+
+    assert not record_filter.filter(log_record(level=logging.INFO))
+    assert record_filter.filter(log_record(level=logging.WARNING))
+
+
+def test_logging_packages_accept_the_list_form(make_project):
+    settings = make_project("""\
+mode: development
+logging:
+  packages:
+    - urllib3
+    - {name: botocore.credentials, sampling: {probability: 0.01}}
+""")
+    section = dataclasses.asdict(settings.__settings__.general_settings.logging)
+
+    assert package_options(section['packages']) == {
+        'urllib3': {},
+        'botocore.credentials': {'sampling': {'probability': 0.01}},
+    }
+    assert package_options({'urllib3': None}) == {'urllib3': {}}
+    with pytest.raises(ValueError):
+        package_options([{'sampling': {'probability': 0.01}}])
@@ -0,0 +1,102 @@
+from typing import List, Optional
+
+import pytest
+
+from settingsgen.overrides import apply_env_overrides, coerce, deep_merge, env_path_map
+
+SETTINGS_YAML = """\
+mode: development
+debug: false
+robot:
+  name: ur5
+  arm:
+    speed: 1.5
+    joints: 6
+  tags: [fast]
+"""
+
+
+@pytest.fixture
+def clean_environment(monkeypatch):
+    monkeypatch.setattr('settingsgen.overrides._is_dotenv_loaded', True)
+    for name in ('APP__MODE', 'APP__DEBUG', 'APP__ROBOT__ARM__SPEED', 'APP__ROBOT__ARM__JOINTS', 'APP__ROBOT__TAGS'):
+        monkeypatch.delenv(name, raising=False)
+    return monkeypatch
+
+
+@pytest.mark.parametrize('text, annotation, value', [
+    ('2.5', float, 2.5),
+    ('7', int, 7),
+    ('Yes', bool, True),
+    ('off', bool, False),
+    ('none', Optional[int], None),
+    ('3', Optional[int], 3),
+    ('[1, 2]', List[int], [1, 2]),
+    ('1, 2', List[int], [1, 2]),
+    ('ur5', str, 'ur5'),
+])
+def test_coerce_converts_to_the_field_type(text, annotation, value):
+    assert coerce(text, annotation) == value
+    assert type(coerce(text, annotation)) is type(value)
+
+
+@pytest.mark.parametrize('text, annotation', [('fast', float), ('maybe', bool), ('{}', List[int])])
+def test_coerce_rejects_what_does_not_fit(text, annotation):
+    with pytest.raises(ValueError):
+        coerce(text, annotation)
+
+
+def test_deep_merge_merges_mappings_and_replaces_the_rest():
+    base = {'robot': {'name': 'ur5', 'tags': ['fast']}, 'mode': 'development'}
+
+    merged = deep_merge(base, {'robot': {'tags': ['slow']}, 'mode': 'production'})
+
+    assert merged == {'robot': {'name': 'ur5', 'tags': ['slow']}, 'mode': 'production'}
+    assert base['robot']['tags'] == ['fast']
+
+
+def test_environment_variables_override_the_typed_fields(make_project, clean_environment):
+    settings_types = make_project(SETTINGS_YAML).types
+    assert env_path_map(settings_types.RootSchema)['APP__ROBOT__ARM__SPEED'] == (('robot', 'arm', 'speed'), float)
+    environ = {'APP__ROBOT__ARM__SPEED': '2', 'APP__DEBUG': 'true', 'APP__ROBOT__TAGS': 'slow,safe',
+               'APP__UNKNOWN': 'ignored'}
+
+    data = apply_env_overrides({'robot': {'arm': {'speed': 1.5, 'joints': 6}}}, settings_types.RootSchema,
+                               environ=environ)
+
+    assert data == {'debug': True, 'robot': {'arm': {'speed': 2.0, 'joints': 6}, 'tags': ['slow', 'safe']}}
+    assert type(data['robot']['arm']['speed']) is float
+
+
+def test_a_wrong_environment_variable_names_the_setting(make_project, clean_environment):
+    settings_types = make_project(SETTINGS_YAML).types
+
+    with pytest.raises(ValueError, match='`APP__ROBOT__ARM__JOINTS` can not override `robot.arm.joints`'):
+        apply_env_overrides({}, settings_types.RootSchema, environ={'APP__ROBOT__ARM__JOINTS': 'six'})
+
+
+def test_settings_layer_the_mode_file_and_the_environment(make_project, clean_environment):
+    settings = make_project(SETTINGS_YAML)
+    (settings.project_dir / 'settings.production.yaml').write_text('robot:\n  arm:\n    joints: 7\n')
+    (settings.project_dir / 'settings.development.yaml').write_text('robot:\n  name: ur10\n')
+    clean_environment.setenv('APP__ROBOT__ARM__SPEED', '2.5')
+
+    development = settings.Configurator(str(settings.project_dir)).general_settings
+    assert (development.robot.name, development.robot.arm.joints, development.robot.arm.speed) == ('ur10', 6, 2.5)
+
+    clean_environment.setenv('APP__MODE', 'production')
+    production = settings.Configurator(str(settings.project_dir)).general_settings
+    assert (production.mode, production.robot.name, production.robot.arm.joints) == ('production', 'ur5', 7)
+
+    unlayered = settings.Configurator(str(settings.project_dir), layered=False).general_settings
+    assert (unlayered.mode, unlayered.robot.arm.speed) == ('development', 1.5)
+
+
+def test_a_created_mode_file_is_picked_up(make_project, clean_environment):
+    settings = make_project(SETTINGS_YAML)
+    configurator = settings.Configurator(str(settings.project_dir))
+    assert configurator.general_settings.robot.name == 'ur5'
+
+    (settings.project_dir / 'settings.development.yaml').write_text('robot:\n  name: ur10\n')
+
+    assert configurator.reload().robot.name == 'ur10'
@@ -0,0 +1,80 @@
+import pytest
+
+from settingsgen.path_index import PathIndex, build_path_index, changed_paths, resolve_path
+
+LAZY_YAML = """\
+mode: development
+robot:
+  name: ur5
+  arm:
+    speed: 1.5
+  waypoints:
+    - x: 1
+"""
+
+SETTINGS = {'robot': {'name': 'ur5', 'waypoints': [{'x': 1}, {'x': 3}]}, 7: 'seven'}
+
+
+def test_resolve_path_follows_dicts_and_list_positions():
+    assert resolve_path(SETTINGS, 'robot.waypoints.1.x') == 3
+    assert resolve_path(SETTINGS, '7') == 'seven'
+    assert resolve_path(SETTINGS, 'robot.waypoints.01.x', 'missing') == 'missing'
+    assert resolve_path(SETTINGS, 'robot.waypoints.2', 'missing') == 'missing'
+    assert resolve_path(SETTINGS, 'robot.name.first') is None
+
+
+def test_path_index_matches_the_full_index():
+    index = PathIndex(SETTINGS)
+
+    assert index['robot.name'] == 'ur5'
+    assert index.get_many(['robot.name', 'robot.nope'], 'missing') == {'robot.name': 'ur5', 'robot.nope': 'missing'}
+    assert dict(index) == build_path_index(SETTINGS)
+    assert len(index) == 8
+
+
+def test_changed_paths_include_the_parents():
+    new = {'robot': {'name': 'ur10', 'waypoints': [{'x': 1}, {'x': 3}]}, 7: 'seven'}
+
+    assert changed_paths(SETTINGS, new) == ['robot', 'robot.name']
+
+
+def test_lazy_path_lookups_only_build_their_sections(make_project):
+    settings = make_project(LAZY_YAML, lazy=True)
+    configurator = settings.Configurator(str(settings.project_dir))
+
+    assert configurator['robot.arm.speed'] == 1.5
+    assert 'robot.nope' not in configurator
+
+    robot = configurator.general_settings.robot
+    assert 'arm' in vars(robot)
+    assert 'waypoints' not in vars(robot)
+
+
+def test_lazy_changed_paths_keep_unchanged_sections_unbuilt(make_project):
+    settings = make_project(LAZY_YAML, lazy=True)
+    configurator = settings.Configurator(str(settings.project_dir))
+    old, new = configurator.reload(), configurator.reload()
+
+    assert changed_paths(old, new) == []
+    assert 'robot' not in vars(old) and 'robot' not in vars(new)
+
+    settings_yaml = settings.project_dir / 'settings.yaml'
+    settings_yaml.write_text(settings_yaml.read_text().replace('1.5', '2.0'))
+    assert changed_paths(old, configurator.reload()) == ['robot', 'robot.arm', 'robot.arm.speed']
+
+
+def test_configurator_lookups_share_one_index_per_snapshot(make_project):
+    settings = make_project(LAZY_YAML)
+    configurator = settings.Configurator(str(settings.project_dir))
+
+    assert configurator['robot.waypoints.0.x'] == 1
+    assert configurator.get('robot.arm.nope', 'missing') == 'missing'
+    assert configurator.get_many(['mode', 'robot.name']) == {'mode': 'development', 'robot.name': 'ur5'}
+    assert 'robot.arm' in configurator
+    with pytest.raises(KeyError):
+        configurator['robot.nope']
+    index = configurator.path_index
+    assert configurator.path_index is index
+
+    configurator.reload()
+    assert configurator.path_index is not index
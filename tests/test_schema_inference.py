@@ -0,0 +1,36 @@
+from typing import Optional
+
+from settingsgen.schema_inference import (ANY, EMPTY, FLOAT, INT, NONE, STR, infer_shape, is_nullable, unify,
+                                          without_none)
+
+
+def test_list_items_are_unified():
+    shape = infer_shape([{'x': 1, 'label': 'a'}, {'x': 2.5}, {'x': 3, 'label': None}])
+
+    assert shape == ('list', ('dict', (('x', FLOAT, True), ('label', ('union', (STR, NONE)), False))))
+
+
+def test_differing_scalars_become_a_union():
+    assert infer_shape([1, 'two', None]) == ('list', ('union', (INT, STR, NONE)))
+    assert unify(('union', (INT, STR)), FLOAT) == ('union', (FLOAT, STR))
+    assert unify(INT, ANY) == ANY
+
+
+def test_nested_lists_and_mappings_unify_per_kind():
+    shape = infer_shape([[1], [2.0], {'a': 1}, {'b': 'x'}])
+
+    assert shape == ('list', ('union', (('list', FLOAT), ('dict', (('a', INT, False), ('b', STR, False))))))
+
+
+def test_empty_lists_and_none():
+    assert infer_shape([]) == ('list', EMPTY)
+    assert infer_shape([[], [1]]) == ('list', ('list', INT))
+    assert is_nullable(('union', (INT, NONE))) and not is_nullable(INT)
+    assert without_none(('union', (INT, NONE))) == INT
+
+
+def test_later_items_are_not_missed(make_project):
+    waypoints = ''.join(f'  - x: {x}\n' for x in range(20)) + '  - x: 1.5\n    label: last\n'
+    settings_types = make_project(f'mode: development\nwaypoints:\n{waypoints}').types
+
+    assert settings_types.Waypoints.__annotations__ == {'x': float, 'label': Optional[str]}
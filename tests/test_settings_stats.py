@@ -0,0 +1,40 @@
+SETTINGS_YAML = """\
+mode: development
+robot:
+  arm:
+    speed: 1.5
+stats:
+  enabled: true
+"""
+
+
+def test_instrumented_settings_count_the_accessed_paths(make_project):
+    settings = make_project(SETTINGS_YAML, instrument=True)
+    app_settings = settings.InstrumentedAppSettings(str(settings.project_dir))
+
+    for _ in range(3):
+        assert app_settings.arm.speed == 1.5
+    assert app_settings['robot.arm.speed'] == 1.5
+    assert app_settings.get('robot.nope', 0) == 0
+    assert app_settings.get_many(['robot.arm.speed']) == {'robot.arm.speed': 1.5}
+    assert 'robot' in app_settings
+
+    stats = app_settings.stats()
+    assert stats['paths'] == {'robot.arm': 3, 'robot.arm.speed': 2, 'robot.nope': 1, 'robot': 1}
+    assert stats['reloads']['count'] == 1
+    assert stats['parses']['count'] == 1
+
+
+def test_sections_do_not_shadow_the_instrumentation_methods(make_project):
+    settings = make_project(SETTINGS_YAML, instrument=True)
+    app_settings = settings.InstrumentedAppSettings(str(settings.project_dir))
+
+    assert callable(app_settings.stats)
+    assert app_settings.general_settings.stats.enabled is True
+
+
+def test_uninstrumented_settings_have_no_stats(make_project):
+    settings = make_project(SETTINGS_YAML)
+
+    assert not hasattr(settings, 'InstrumentedAppSettings')
+    assert settings.AppSettings(str(settings.project_dir)).stats.enabled is True
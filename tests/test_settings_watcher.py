@@ -0,0 +1,91 @@
+import threading
+
+import pytest
+
+from settingsgen.settings_watcher import SettingsWatcher
+
+SETTINGS_YAML = """\
+mode: development
+robot:
+  name: ur5
+  arm:
+    speed: 1.5
+"""
+
+WATCHER_OPTIONS = {'debounce': 0.01, 'poll_interval': 0.01}
+
+
+@pytest.fixture(params=[False, True], ids=['polling', 'inotify'])
+def use_inotify(request):
+    if request.param and not SettingsWatcher(__file__, lambda: None).uses_inotify:
+        pytest.skip('inotify is not available')
+    return request.param
+
+
+def test_a_write_calls_back_once_it_settled(tmp_path, use_inotify):
+    settings_yaml = tmp_path / 'settings.yaml'
+    settings_yaml.write_text('mode: development\n')
+    changed = threading.Event()
+    watcher = SettingsWatcher(str(settings_yaml), changed.set, use_inotify=use_inotify, **WATCHER_OPTIONS).start()
+    try:
+        (tmp_path / 'unrelated.yaml').write_text('mode: production\n')
+        assert not changed.wait(0.2)
+
+        settings_yaml.write_text('mode: production\n')
+        assert changed.wait(5)
+    finally:
+        watcher.stop()
+    assert not watcher.is_running
+
+
+def test_a_failing_callback_keeps_the_watcher_running(tmp_path):
+    settings_yaml = tmp_path / 'settings.yaml'
+    settings_yaml.write_text('mode: development\n')
+    calls = []
+    first_call, second_call = threading.Event(), threading.Event()
+
+    def callback():
+        calls.append(settings_yaml.read_text())
+        if len(calls) == 1:
+            first_call.set()
+            raise ValueError('Invalid settings')
+        second_call.set()
+
+    watcher = SettingsWatcher(str(settings_yaml), callback, use_inotify=False, **WATCHER_OPTIONS).start()
+    try:
+        settings_yaml.write_text('mode: [\n')
+        assert first_call.wait(5)
+        settings_yaml.write_text('mode: production\n')
+        assert second_call.wait(5)
+    finally:
+        watcher.stop()
+    assert calls == ['mode: [\n', 'mode: production\n']
+
+
+def test_other_filepaths_have_to_be_next_to_the_file(tmp_path):
+    with pytest.raises(ValueError, match='is not in the directory'):
+        SettingsWatcher(str(tmp_path / 'settings.yaml'), lambda: None, other_filepaths=[str(tmp_path / 'a' / 'b.yaml')])
+
+
+def test_watched_settings_reload_and_notify_subscribers(make_project, use_inotify):
+    settings = make_project(SETTINGS_YAML)
+    configurator = settings.Configurator(str(settings.project_dir))
+    changes = []
+    notified = threading.Event()
+
+    @configurator.on_change('robot.arm.speed')
+    def on_speed_change(old_value, new_value):
+        changes.append((old_value, new_value))
+        notified.set()
+
+    configurator.on_change('robot.name', lambda old_value, new_value: changes.append('name changed'))
+    configurator.watch(use_inotify=use_inotify, **WATCHER_OPTIONS)
+    try:
+        settings_yaml = settings.project_dir / 'settings.yaml'
+        settings_yaml.write_text(SETTINGS_YAML.replace('1.5', '2.25'))
+        assert notified.wait(5)
+    finally:
+        configurator.stop_watching()
+
+    assert changes == [(1.5, 2.25)]
+    assert configurator.snapshot.robot.arm.speed == 2.25
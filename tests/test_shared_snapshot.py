@@ -0,0 +1,54 @@
+import datetime
+
+from settingsgen.shared_snapshot import SharedSnapshotPublisher, SharedSnapshotReader
+
+
+def test_shared_snapshot_handles_dates(tmp_path):
+    shared_file = str(tmp_path / 'settings.shm')
+    publisher = SharedSnapshotPublisher(shared_file)
+    reader = SharedSnapshotReader(shared_file)
+
+    version = publisher.publish({'release': datetime.date(2024, 1, 1)})
+
+    assert reader.read() == (version, {'release': datetime.date(2024, 1, 1)})
+    reader.close()
+    publisher.close()
+
+
+def test_readers_see_nothing_before_the_first_publish(tmp_path):
+    shared_file = str(tmp_path / 'settings.shm')
+    reader = SharedSnapshotReader(shared_file)
+    assert reader.read() == (0, None)
+
+    publisher = SharedSnapshotPublisher(shared_file)
+    assert (reader.version(), reader.read()) == (0, (0, None))
+    reader.close()
+    publisher.close()
+
+
+def test_readers_follow_a_growing_snapshot(tmp_path):
+    shared_file = str(tmp_path / 'settings.shm')
+    publisher = SharedSnapshotPublisher(shared_file)
+    reader = SharedSnapshotReader(shared_file)
+    first = publisher.publish({'mode': 'development'})
+    assert reader.read() == (first, {'mode': 'development'})
+
+    second = publisher.publish({'mode': 'production', 'names': ['ur5'] * 10000})
+
+    assert second > first and second % 2 == 0
+    assert reader.version() == second
+    assert reader.read() == (second, {'mode': 'production', 'names': ['ur5'] * 10000})
+    reader.close()
+    publisher.close()
+
+
+def test_a_new_publisher_keeps_counting(tmp_path):
+    shared_file = str(tmp_path / 'settings.shm')
+    publisher = SharedSnapshotPublisher(shared_file)
+    version = publisher.publish({'mode': 'development'})
+    publisher.close()
+
+    publisher = SharedSnapshotPublisher(shared_file)
+
+    assert publisher.publish({'mode': 'production'}) > version
+    publisher.close()
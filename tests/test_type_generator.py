@@ -0,0 +1,51 @@
+from settingsgen.generate_settings import generate_app_settings
+from settingsgen.type_generator import should_save_file
+from settingsgen.yaml_to_dataclass import fingerprint_header, read_fingerprint
+
+TYPES_CODE = """\
+from dataclasses import dataclass
+
+
+@dataclass
+class RootSchema:
+    mode: str
+"""
+
+
+def generated(fingerprint: str, body: str = TYPES_CODE) -> str:
+    return fingerprint_header(fingerprint, body) + body
+
+
+def test_equal_fingerprints_skip_comparing_the_code():
+    # The bodies are not even parsed, only the fingerprints are compared
+    assert not should_save_file(generated('abc'), generated('abc', 'not python ('))
+    assert should_save_file(generated('abc'), generated('def'))
+
+
+def test_code_without_a_fingerprint_is_rewritten_once():
+    assert should_save_file(TYPES_CODE, generated('abc'))
+    assert should_save_file('', generated('abc'))
+
+
+def test_edited_code_is_compared_by_its_ast():
+    edited = generated('abc').replace('mode: str', 'mode:   str')
+    assert read_fingerprint(edited) is None
+
+    assert not should_save_file(edited, generated('abc'))
+    assert should_save_file(edited.replace('mode', 'name'), generated('abc'))
+
+
+def test_forced_regeneration_keeps_unchanged_types(make_project):
+    settings = make_project('mode: development\nrobot:\n  name: ur5\n')
+    settings_types = settings.project_dir / 'settings' / 'settings_types.py'
+    content = settings_types.read_text()
+    assert read_fingerprint(content) is not None
+    settings_types.touch()
+    mtime = settings_types.stat().st_mtime_ns
+
+    generate_app_settings(str(settings.project_dir), force=True)
+    assert settings_types.stat().st_mtime_ns == mtime
+
+    (settings.project_dir / 'settings.yaml').write_text('mode: development\nrobot:\n  name: 5\n')
+    generate_app_settings(str(settings.project_dir), force=True)
+    assert read_fingerprint(settings_types.read_text()) not in (None, read_fingerprint(content))
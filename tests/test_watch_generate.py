@@ -0,0 +1,62 @@
+import threading
+
+from settingsgen.batch_generate import CHANGED, FAILED, UNCHANGED
+from settingsgen.watch_generate import GeneratorDaemon
+
+
+class RecordingDaemon(GeneratorDaemon):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.results = []
+        self.regenerated = threading.Event()
+
+    def regenerate(self, directories, **options):
+        results = super().regenerate(directories, **options)
+        self.results.append([(result.directory, result.status) for result in results])
+        self.regenerated.set()
+        return results
+
+
+def test_changed_projects_are_regenerated(tmp_path):
+    projects = [tmp_path / 'first', tmp_path / 'second']
+    for project in projects:
+        project.mkdir()
+        (project / 'settings.yaml').write_text('mode: development\n')
+    daemon = RecordingDaemon([str(project) for project in projects], debounce=0.01, poll_interval=0.01,
+                             use_inotify=False)
+    thread = threading.Thread(target=daemon.run)
+    thread.start()
+    try:
+        assert daemon.regenerated.wait(10)
+        daemon.regenerated.clear()
+        (projects[1] / 'settings.yaml').write_text('mode: development\nrobot:\n  name: ur5\n')
+        assert daemon.regenerated.wait(10)
+    finally:
+        daemon.stop()
+        thread.join(10)
+
+    assert not thread.is_alive()
+    assert daemon.results == [[(str(projects[0]), CHANGED), (str(projects[1]), CHANGED)],
+                              [(str(projects[1]), CHANGED)]]
+    assert 'class Robot' in (projects[1] / 'settings' / 'settings_types.py').read_text()
+
+
+def test_a_failing_project_keeps_the_daemon_running(tmp_path):
+    (tmp_path / 'settings.yaml').write_text('mode: development\n')
+    daemon = RecordingDaemon([str(tmp_path)], debounce=0.01, poll_interval=0.01, use_inotify=False)
+    thread = threading.Thread(target=daemon.run)
+    thread.start()
+    try:
+        assert daemon.regenerated.wait(10)
+        daemon.regenerated.clear()
+        (tmp_path / 'settings.yaml').write_text('mode: [\n')
+        assert daemon.regenerated.wait(10)
+        daemon.regenerated.clear()
+        (tmp_path / 'settings.yaml').write_text('mode: development\n')
+        assert daemon.regenerated.wait(10)
+    finally:
+        daemon.stop()
+        thread.join(10)
+
+    assert [statuses for [(_, statuses)] in daemon.results] == [CHANGED, FAILED, UNCHANGED]
@@ -0,0 +1,120 @@
+import pickle
+
+import pytest
+
+from settingsgen import yaml_loader
+from settingsgen.generate_settings import generate_app_settings
+from settingsgen.yaml_loader import CACHE_FORMAT_VERSION, cache_path_for, load_yaml, load_yaml_sample
+
+SETTINGS_YAML = """\
+mode: development
+defaults: &defaults
+  speed: 1.5
+robot:
+  <<: *defaults
+  name: ur5
+"""
+
+
+@pytest.fixture
+def parse_calls(monkeypatch):
+    calls = []
+    parse_yaml = yaml_loader.parse_yaml
+
+    def counting_parse_yaml(content, round_trip=False):
+        calls.append(round_trip)
+        return parse_yaml(content, round_trip)
+
+    monkeypatch.setattr(yaml_loader, 'parse_yaml', counting_parse_yaml)
+    monkeypatch.delenv('SETTINGS_PARSE_CACHE', raising=False)
+    return calls
+
+
+def test_unchanged_yaml_is_loaded_from_the_cache(tmp_path, parse_calls):
+    settings_yaml = tmp_path / 'settings.yaml'
+    settings_yaml.write_text(SETTINGS_YAML)
+
+    data = load_yaml(str(settings_yaml))
+
+    assert data['robot'] == {'speed': 1.5, 'name': 'ur5'}
+    assert (tmp_path / '.settings.yaml.cache').exists()
+    assert load_yaml(str(settings_yaml)) == data
+    assert parse_calls == [False]
+
+    # Keyed by the content, touching the file keeps the cache
+    settings_yaml.touch()
+    load_yaml(str(settings_yaml))
+    assert parse_calls == [False]
+
+    settings_yaml.write_text(SETTINGS_YAML.replace('ur5', 'ur10'))
+    assert load_yaml(str(settings_yaml))['robot']['name'] == 'ur10'
+    assert parse_calls == [False, False]
+
+
+def test_a_corrupt_or_outdated_cache_is_a_miss(tmp_path, parse_calls):
+    settings_yaml = tmp_path / 'settings.yaml'
+    settings_yaml.write_text(SETTINGS_YAML)
+    cache_path = cache_path_for(str(settings_yaml))
+    load_yaml(str(settings_yaml))
+
+    with open(cache_path, 'rb') as cache_file:
+        _, digest, data = pickle.load(cache_file)
+    with open(cache_path, 'wb') as cache_file:
+        pickle.dump((CACHE_FORMAT_VERSION + 1, digest, {'mode': 'outdated'}), cache_file)
+    assert load_yaml(str(settings_yaml))['mode'] == 'development'
+
+    with open(cache_path, 'wb') as cache_file:
+        cache_file.write(b'corrupt')
+    assert load_yaml(str(settings_yaml))['mode'] == 'development'
+    assert parse_calls == [False, False, False]
+
+
+def test_the_cache_can_be_disabled(tmp_path, parse_calls, monkeypatch):
+    settings_yaml = tmp_path / 'settings.yaml'
+    settings_yaml.write_text(SETTINGS_YAML)
+    monkeypatch.setenv('SETTINGS_PARSE_CACHE', '0')
+
+    load_yaml(str(settings_yaml))
+    load_yaml(str(settings_yaml), round_trip=True)
+
+    assert parse_calls == [False, True]
+    assert not (tmp_path / '.settings.yaml.cache').exists()
+
+
+def test_sample_loads_only_the_first_list_items(tmp_path):
+    settings_yaml = tmp_path / 'settings.yaml'
+    settings_yaml.write_text(SETTINGS_YAML + 'waypoints:\n' + ''.join(f'  - x: {x}\n' for x in range(5)))
+
+    data = load_yaml_sample(str(settings_yaml), sample_size=2)
+
+    assert data['waypoints'] == [{'x': 0}, {'x': 1}]
+    assert data['robot'] == {'speed': 1.5, 'name': 'ur5'}
+
+
+def test_sample_resolves_anchors_and_skips_nested_items(tmp_path):
+    settings_yaml = tmp_path / 'settings.yaml'
+    settings_yaml.write_text(
+        'tables:\n'
+        '  - &first {rows: [[1, 2], [3, 4], [5, 6]]}\n'
+        '  - {rows: [[7]]}\n'
+        '  - &skipped {rows: [[8]]}\n'
+        'copy: *first\n'
+        'lost: *skipped\n'
+    )
+
+    data = load_yaml_sample(str(settings_yaml), sample_size=2)
+
+    assert data['tables'] == [{'rows': [[1, 2], [3, 4]]}, {'rows': [[7]]}]
+    assert data['copy'] == {'rows': [[1, 2], [3, 4]]}
+    assert data['lost'] is None
+
+
+def test_sampled_generation_types_the_sampled_items(tmp_path):
+    (tmp_path / 'settings.yaml').write_text('mode: development\nwaypoints:\n' +
+                                            ''.join(f'  - x: {x}\n' for x in range(100)) + '  - x: one\n')
+
+    generate_app_settings(str(tmp_path), sample_size=10)
+    assert 'x: int' in (tmp_path / 'settings' / 'settings_types.py').read_text()
+
+    generate_app_settings(str(tmp_path), force=True)
+    assert 'x: Union[int, str]' in (tmp_path / 'settings' / 'settings_types.py').read_text()